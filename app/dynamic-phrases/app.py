@@ -1,5 +1,9 @@
-from flask import Flask, request, jsonify, render_template
+import time
+IMPORT_START = time.perf_counter()  # startup timing includes the heavy imports below
+from flask import Flask, Response, request, jsonify, render_template
 from flask_cors import CORS
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
 import tensorflow as tf
 import numpy as np
 import cv2
@@ -10,11 +14,20 @@ import logging
 import os
 from collections import deque
 import threading
-import queue
-import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from inference import create_engine, DEFAULT_BACKEND, StreamingEngine, warm_up, warmup_batch_sizes
+from decode import decode_base64, decode_frame
+from recording import SessionRecorder
+from metrics import REGISTRY as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from logsetup import configure_logging, log_event, logging_stats, set_level, set_sample_rate
+from keypoints import (KEYPOINT_SIZE, FrameRingBuffer, MotionHistory, extract_keypoints_into,
+                       hand_motion, stride_for_motion)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: JSON lines through a non-blocking queue, per-frame
+# events sampled (see logsetup.py and LOG_* in the README)
+configure_logging('dynamic-phrases', sample_rates={'/predict': 0.01, '/ws': 0.01})
 logger = logging.getLogger(__name__)
 
 # Suppress MediaPipe warnings
@@ -22,30 +35,233 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow logging
 import absl.logging
 absl.logging.set_verbosity(absl.logging.ERROR)
 
-# Configure TensorFlow for better performance
-tf.config.threading.set_inter_op_parallelism_threads(2)
-tf.config.threading.set_intra_op_parallelism_threads(2)
+# Configure TensorFlow for better performance. These are per process: with
+# several server workers keep workers x intra-op threads within the core count
+TF_INTER_OP_THREADS = int(os.environ.get('TF_INTER_OP_THREADS', '2'))
+TF_INTRA_OP_THREADS = int(os.environ.get('TF_INTRA_OP_THREADS', '2'))
+tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+
+class StartupTracker:
+    """Startup phase timings and the readiness flag served by /ready.
+
+    ``phase(name)`` times a block of startup work and ``set_ready()`` marks
+    the end of warmup, so cold-start cost can be broken down and tracked.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.phases = {}
+        self.ready = False
+        self.ready_after = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = seconds
+
+    def set_ready(self):
+        with self._lock:
+            self.ready = True
+            self.ready_after = time.perf_counter() - self.started
+
+    def fail(self, error):
+        with self._lock:
+            self.error = str(error)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'error': self.error,
+                'uptime_s': round(time.perf_counter() - self.started, 3),
+                'ready_after_ms': round(self.ready_after * 1000, 3) if self.ready_after is not None else None,
+                'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()}
+            }
+
+startup = StartupTracker(IMPORT_START)
+startup.record('imports', time.perf_counter() - IMPORT_START)
 
 app = Flask(__name__)
 CORS(app)
 
+# WebSocket streaming settings (see /ws)
+WS_MAX_MESSAGE_BYTES = int(os.environ.get('WS_MAX_MESSAGE_BYTES', str(2 * 1024 * 1024)))
+WS_PING_INTERVAL = float(os.environ.get('WS_PING_INTERVAL', '25'))
+app.config['SOCK_SERVER_OPTIONS'] = {
+    'ping_interval': WS_PING_INTERVAL,
+    'max_message_size': WS_MAX_MESSAGE_BYTES
+}
+sock = Sock(app)
+
 # Initialize MediaPipe with optimized settings
 mp_holistic = mp.solutions.holistic
-holistic = mp_holistic.Holistic(
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    model_complexity=0,  # Reduced complexity for better performance
-    enable_segmentation=False,
-    refine_face_landmarks=False,
-    static_image_mode=False
-)
+
+# Per-client Holistic tracker pool settings; by default every live session
+# (SESSION_MAX_COUNT) can keep its own tracker
+HOLISTIC_POOL_SIZE = int(os.environ.get('HOLISTIC_POOL_SIZE', os.environ.get('SESSION_MAX_COUNT', '200')))
+HOLISTIC_IDLE_TIMEOUT = float(os.environ.get('HOLISTIC_IDLE_TIMEOUT', '60'))
+
+# Frames are decoded (and downscaled) to at most this width before MediaPipe;
+# 0 keeps the uploaded resolution
+DECODE_TARGET_WIDTH = int(os.environ.get('DECODE_TARGET_WIDTH', '640'))
+
+def create_holistic():
+    return mp_holistic.Holistic(
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        model_complexity=0,  # Reduced complexity for better performance
+        enable_segmentation=False,
+        refine_face_landmarks=False,
+        static_image_mode=False
+    )
+
+class HolisticPool:
+    """Session-scoped Holistic trackers keyed by clientId.
+
+    Tracking mode assumes one continuous video stream, so each client gets its
+    own tracker (keeping tracking warm between its frames) and different
+    clients can run their graphs in parallel. A tracker is only closed when
+    it has been idle for longer than ``idle_timeout`` or its session ends,
+    never to make room for another client: evicting a live client's tracker
+    would cost both clients a cold start on their next frame. Once
+    ``max_trackers`` exist, further clients share one overflow tracker until
+    a slot frees up.
+    """
+
+    def __init__(self, max_trackers, idle_timeout):
+        self.max_trackers = max(1, max_trackers)
+        self.idle_timeout = idle_timeout
+        self._trackers = {}
+        self._shared = self._new_entry(time.time())
+        self._lock = threading.Lock()
+        self._created = 0
+        self._shared_frames = 0
+        self._expired = 0
+        self._warm_frames = 0
+        self._warm_time = 0.0
+        self._cold_frames = 0
+        self._cold_time = 0.0
+        self._spares = []
+
+    def add_spare(self, holistic):
+        """Keep an already initialized tracker for the next new client"""
+        with self._lock:
+            self._spares.append(holistic)
+
+    @staticmethod
+    def _new_entry(now):
+        return {'holistic': None, 'lock': threading.Lock(), 'in_use': 0, 'last_used': now, 'frames': 0}
+
+    def _close(self, entry):
+        try:
+            entry['holistic'].close()
+        except Exception as e:
+            logger.warning(f"Error closing Holistic tracker: {e}")
+
+    def _sweep(self, now):
+        """Drop idle trackers; caller holds self._lock"""
+        removed = []
+        for client_id, entry in list(self._trackers.items()):
+            if entry['in_use']:
+                continue
+            if now - entry['last_used'] > self.idle_timeout:
+                removed.append(self._trackers.pop(client_id))
+                self._expired += 1
+        return removed
+
+    @contextmanager
+    def checkout(self, client_id):
+        """Use the client's tracker for one frame, creating it if there is room"""
+        now = time.time()
+        with self._lock:
+            removed = self._sweep(now)
+            entry = self._trackers.get(client_id)
+            if entry is None and len(self._trackers) < self.max_trackers:
+                entry = self._trackers[client_id] = self._new_entry(now)
+            if entry is None:
+                # Pool is full of live clients: share the overflow tracker
+                entry = self._shared
+                self._shared_frames += 1
+            entry['in_use'] += 1
+        for old_entry in removed:
+            self._close(old_entry)
+
+        try:
+            # Frames from one client are processed in order on its own tracker
+            with entry['lock']:
+                if entry['holistic'] is None:
+                    with self._lock:
+                        spare = self._spares.pop() if self._spares else None
+                    if spare is None:
+                        spare = create_holistic()
+                        with self._lock:
+                            self._created += 1
+                    entry['holistic'] = spare
+                cold = entry['frames'] == 0
+                start = time.perf_counter()
+                yield entry['holistic']
+                elapsed = time.perf_counter() - start
+                entry['frames'] += 1
+            with self._lock:
+                if cold:
+                    self._cold_frames += 1
+                    self._cold_time += elapsed
+                else:
+                    self._warm_frames += 1
+                    self._warm_time += elapsed
+        finally:
+            with self._lock:
+                entry['in_use'] -= 1
+                entry['last_used'] = time.time()
+
+    def release(self, client_id):
+        """Close a client's tracker (e.g. when its session ends)"""
+        with self._lock:
+            entry = self._trackers.get(client_id)
+            if entry is None or entry['in_use']:
+                return
+            del self._trackers[client_id]
+        self._close(entry)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'trackers': len(self._trackers),
+                'max_trackers': self.max_trackers,
+                'spares': len(self._spares),
+                'created': self._created,
+                'shared_frames': self._shared_frames,
+                'expired': self._expired,
+                'cold_frames': self._cold_frames,
+                'avg_cold_process_ms': round(self._cold_time / self._cold_frames * 1000, 3) if self._cold_frames else 0.0,
+                'warm_frames': self._warm_frames,
+                'avg_warm_process_ms': round(self._warm_time / self._warm_frames * 1000, 3) if self._warm_frames else 0.0
+            }
+
+holistic_pool = HolisticPool(HOLISTIC_POOL_SIZE, HOLISTIC_IDLE_TIMEOUT)
+
+# Inference backend for the action model: keras, tf_function, tflite or numpy
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', DEFAULT_BACKEND)
 
 # Load the model
 try:
-    model = tf.keras.models.load_model('action.h5')
-    # Optimize model for inference
-    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-    logger.info("Model loaded successfully")
+    with startup.phase('model_load'):
+        model = tf.keras.models.load_model('action.h5')
+        # Optimize model for inference
+        model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    with startup.phase('engine_build'):
+        engine = create_engine(model, INFERENCE_BACKEND, 'action.h5')
+    logger.info(f"Model loaded successfully (inference backend: {engine.name})")
 except Exception as e:
     logger.error(f"Error loading model: {e}")
     raise
@@ -68,15 +284,33 @@ english_labels = {
     'mahal kita': 'iloveyou'
 }
 
-# Create a sequence buffer for each client
-sequence_buffer = {}
-prediction_queue = queue.Queue()
+# Number of frames in each prediction window
+SEQUENCE_LENGTH = 30
+
+# Inference mode: 'windowed' runs the action model over the whole 30-frame window,
+# 'streaming' carries LSTM state per client and feeds only the newest frame
+INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'windowed').lower()
+STREAMING_STREAMS = int(os.environ.get('STREAMING_STREAMS', '2'))
+
+streaming_engine = None
+if INFERENCE_MODE == 'streaming':
+    try:
+        streaming_engine = StreamingEngine(model, SEQUENCE_LENGTH, STREAMING_STREAMS)
+        logger.info(f"Streaming inference enabled ({STREAMING_STREAMS} staggered streams per client)")
+    except Exception as e:
+        logger.warning(f"Streaming inference unavailable ({e}), using windowed inference")
+
+# Session store settings
+SESSION_TTL = float(os.environ.get('SESSION_TTL', '300'))
+SESSION_MAX_COUNT = int(os.environ.get('SESSION_MAX_COUNT', '200'))
+SESSION_MAX_BYTES = int(os.environ.get('SESSION_MAX_BYTES', str(256 * 1024 * 1024)))
 
 # Initialize client buffer safely with explicit types
 def init_client_buffer():
     """Create a new buffer for a client with proper data types"""
     return {
-        'frames': deque(maxlen=30),
+        'lock': threading.Lock(),  # Serializes frames of this session (see process_frame)
+        'frames': FrameRingBuffer(SEQUENCE_LENGTH, KEYPOINT_SIZE),
         'predictions': deque(maxlen=10),
         'sentence': deque(maxlen=5),
         'last_prediction': ('Waiting for hands...', 0.0, None, False, 'Waiting for hands...'),
@@ -85,12 +319,142 @@ def init_client_buffer():
         'consecutive_predictions': 0,
         'last_action': None,
         'empty_frame_counter': 0,
-        'previous_results': None,
-        'motion_history': deque(maxlen=10),
+        'motion_history': MotionHistory(10),
         'last_iloveyou_time': 0,  # Track when we last detected "iloveyou"
-        'iloveyou_cooldown': 2.0  # Seconds to wait before allowing another "iloveyou" detection
+        'iloveyou_cooldown': 2.0,  # Seconds to wait before allowing another "iloveyou" detection
+        'frames_since_inference': 0,  # Frames since the last window was queued for inference
+        'stream': streaming_engine.new_state() if streaming_engine is not None else None
     }
 
+def estimate_session_bytes(session):
+    """Approximate memory held by one client session"""
+    total = session['frames'].nbytes + session['motion_history'].nbytes
+    total += 32 * (len(session['predictions']) + len(session['sentence']))
+    return total
+
+class SessionStore:
+    """Per-client session state with TTL expiry and LRU eviction.
+
+    Sessions unused for ``ttl`` seconds are dropped, and the least recently
+    used sessions are evicted once there are more than ``max_sessions`` or the
+    approximate memory held exceeds ``max_bytes``. Evicted clients also give
+    up their Holistic tracker; a returning client simply starts a new session.
+    """
+
+    def __init__(self, ttl, max_sessions, max_bytes, on_evict=None):
+        self.ttl = ttl
+        self.max_sessions = max(1, max_sessions)
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._sessions = OrderedDict()
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._bytes_per_session = estimate_session_bytes(init_client_buffer())
+        self._created = 0
+        self._expired = 0
+        self._evicted = 0
+
+    def __contains__(self, client_id):
+        return client_id in self._sessions
+
+    def __getitem__(self, client_id):
+        return self._sessions[client_id]
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, client_id):
+        return self._sessions.get(client_id)
+
+    def get_or_create(self, client_id):
+        """Return the client's session (creating it if needed) and mark it as recently used"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(client_id)
+            if session is None:
+                session = init_client_buffer()
+                self._sessions[client_id] = session
+                self._created += 1
+            else:
+                self._sessions.move_to_end(client_id)
+            self._last_used[client_id] = now
+            removed = self._sweep(now)
+        self._notify(removed)
+        return session
+
+    def _sweep(self, now):
+        """Drop expired and over-capacity sessions; caller holds self._lock"""
+        removed = []
+        # Sessions are kept in LRU order, so expired ones are at the front
+        for client_id in list(self._sessions):
+            if now - self._last_used[client_id] <= self.ttl:
+                break
+            removed.append(client_id)
+            self._expired += 1
+            self._remove(client_id)
+        while len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_sessions or
+                len(self._sessions) * self._bytes_per_session > self.max_bytes):
+            client_id = next(iter(self._sessions))
+            removed.append(client_id)
+            self._evicted += 1
+            self._remove(client_id)
+        return removed
+
+    def _remove(self, client_id):
+        self._sessions.pop(client_id, None)
+        self._last_used.pop(client_id, None)
+
+    def _notify(self, removed):
+        for client_id in removed:
+            logger.info(f"Session for client {client_id} evicted")
+            if self.on_evict:
+                self.on_evict(client_id)
+
+    def discard(self, client_id):
+        """End a client's session now (e.g. when its connection closes)"""
+        with self._lock:
+            if client_id not in self._sessions:
+                return
+            self._remove(client_id)
+        self._notify([client_id])
+
+    def sweep(self):
+        with self._lock:
+            removed = self._sweep(time.time())
+        self._notify(removed)
+
+    def stats(self):
+        self.sweep()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            created, expired, evicted = self._created, self._expired, self._evicted
+        return {
+            'live_sessions': len(sessions),
+            'approx_bytes': sum(estimate_session_bytes(session) for session in sessions),
+            'max_sessions': self.max_sessions,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'created': created,
+            'expired': expired,
+            'evicted': evicted
+        }
+
+# Create a sequence buffer for each client
+def release_client(client_id):
+    """Free per-client resources held outside the session store"""
+    holistic_pool.release(client_id)
+    prediction_scheduler.forget(client_id)
+
+sequence_buffer = SessionStore(SESSION_TTL, SESSION_MAX_COUNT, SESSION_MAX_BYTES,
+                               on_evict=release_client)
+
+# Session recording for replay_session.py (POST /record); off unless enabled
+RECORD_ENABLED = os.environ.get('RECORD_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+RECORD_DIR = os.environ.get('RECORD_DIR', 'recordings')
+RECORD_MAX_FRAMES = int(os.environ.get('RECORD_MAX_FRAMES', '9000'))
+session_recorder = SessionRecorder(RECORD_DIR, RECORD_MAX_FRAMES)
+
 # Constants for prediction stability
 CONFIDENCE_THRESHOLD = 0.65  # Lowered threshold to detect more quickly
 HIGH_CONFIDENCE_THRESHOLD = 0.90  # Lowered to detect 'iloveyou' better
@@ -100,6 +464,19 @@ MAX_EMPTY_FRAMES = 5  # Maximum number of frames without hands before resetting
 VALID_HAND_VISIBILITY_THRESHOLD = 0.2  # Reduced from 0.8 - much more lenient visibility requirement
 MOTION_THRESHOLD = 0.025  # Increased from 0.02 - requiring more motion for dynamic signs
 
+# Inference scheduling: queue a window every INFERENCE_STRIDE frames. In adaptive
+# mode the stride grows towards INFERENCE_STRIDE_MAX while the hands are still.
+INFERENCE_STRIDE = max(1, int(os.environ.get('INFERENCE_STRIDE', '1')))
+INFERENCE_STRIDE_ADAPTIVE = os.environ.get('INFERENCE_STRIDE_ADAPTIVE', 'false').lower() in ('1', 'true', 'yes')
+INFERENCE_STRIDE_MAX = int(os.environ.get('INFERENCE_STRIDE_MAX', '6'))
+
+def inference_stride(motion_history):
+    """Number of frames between inference runs for a client"""
+    if not INFERENCE_STRIDE_ADAPTIVE or len(motion_history) < 3:
+        return INFERENCE_STRIDE
+    recent_motion = motion_history.mean(3)
+    return stride_for_motion(recent_motion, INFERENCE_STRIDE, INFERENCE_STRIDE_MAX, MOTION_THRESHOLD * 0.5)
+
 # Sign-specific settings
 SIGN_TYPES = {
     'hello': 'dynamic',  # Dynamic sign that needs motion
@@ -114,35 +491,16 @@ SIGN_WEIGHTS = {
     'iloveyou': 0.85  # Further reduction for iloveyou to prevent over-detection
 }
 
-def extract_keypoints(results):
+def extract_keypoints(results, out=None):
+    """Extract keypoints into ``out`` (a preallocated float32 row) or a new row"""
     try:
-        pose = np.array([[res.x, res.y, res.z, res.visibility] for res in results.pose_landmarks.landmark]).flatten() if results.pose_landmarks else np.zeros(33*4)
-        face = np.array([[res.x, res.y, res.z] for res in results.face_landmarks.landmark]).flatten() if results.face_landmarks else np.zeros(468*3)
-        lh = np.array([[res.x, res.y, res.z] for res in results.left_hand_landmarks.landmark]).flatten() if results.left_hand_landmarks else np.zeros(21*3)
-        rh = np.array([[res.x, res.y, res.z] for res in results.right_hand_landmarks.landmark]).flatten() if results.right_hand_landmarks else np.zeros(21*3)
-        return np.concatenate([pose, face, lh, rh])
+        if out is None:
+            out = np.empty(KEYPOINT_SIZE, dtype=np.float32)
+        return extract_keypoints_into(results, out)
     except Exception as e:
         logger.error(f"Error extracting keypoints: {e}")
         return None
 
-def calculate_hand_motion(current_hand, previous_hand):
-    """Calculate the amount of motion between two hand landmark frames"""
-    if current_hand is None or previous_hand is None:
-        return 0
-    
-    # Calculate Euclidean distance for each landmark point
-    total_motion = 0
-    for i in range(len(current_hand.landmark)):
-        curr = current_hand.landmark[i]
-        prev = previous_hand.landmark[i]
-        
-        # Distance in 3D space
-        dist = np.sqrt((curr.x - prev.x)**2 + (curr.y - prev.y)**2 + (curr.z - prev.z)**2)
-        total_motion += dist
-    
-    # Return average motion
-    return total_motion / len(current_hand.landmark)
-
 def has_hands(results):
     """Check if hands are present in the frame with simpler, more lenient detection"""
     # Most basic check - are any hand landmarks detected?
@@ -160,13 +518,10 @@ def has_hands(results):
     
     return False
 
-def check_sign_validity(predicted_sign, current_results, previous_results, motion_history):
+def check_sign_validity(predicted_sign, current_results, motion_history):
     """Check if the predicted sign meets the criteria for its type (dynamic vs static)"""
     sign_type = SIGN_TYPES.get(predicted_sign, 'dynamic')
     
-    # Convert any NumPy values in motion_history to Python float
-    motion_history = [float(m) if hasattr(m, 'dtype') else m for m in motion_history]
-    
     # Special handling for specific signs
     if predicted_sign == 'hello':
         # For "hello" we expect hand near forehead 
@@ -189,14 +544,14 @@ def check_sign_validity(predicted_sign, current_results, previous_results, motio
                 
                 # Check for some motion but not too much
                 if len(motion_history) >= 3:
-                    avg_motion = sum(motion_history[-3:]) / 3
+                    avg_motion = motion_history.mean(3)
                     good_motion = MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 2.0
                     
                     return bool(hand_near_forehead and good_motion)
         
         # Fallback to motion-only check
         if len(motion_history) >= 3:
-            avg_motion = sum(motion_history[-3:]) / 3
+            avg_motion = motion_history.mean(3)
             return bool(avg_motion > MOTION_THRESHOLD * 0.8)
     
     elif predicted_sign == 'thanks':
@@ -229,20 +584,20 @@ def check_sign_validity(predicted_sign, current_results, previous_results, motio
             
             # Check for appropriate motion (tapping)
             if len(motion_history) >= 3:
-                avg_motion = sum(motion_history[-3:]) / 3
+                avg_motion = motion_history.mean(3)
                 good_motion = MOTION_THRESHOLD * 0.6 < avg_motion < MOTION_THRESHOLD * 1.5
                 
                 return bool(hands_near_chin and good_motion)
         
         # Fallback to motion-only check
         if len(motion_history) >= 3:
-            avg_motion = sum(motion_history[-3:]) / 3
+            avg_motion = motion_history.mean(3)
             return bool(MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 1.5)
     
     elif predicted_sign == 'iloveyou':
         # For "iloveyou" we expect extended thumb, index, and pinky - static pose
         if len(motion_history) >= 3:
-            avg_motion = sum(motion_history[-3:]) / 3
+            avg_motion = motion_history.mean(3)
             
             # Low motion threshold for this static sign
             low_motion = avg_motion < MOTION_THRESHOLD * 0.5
@@ -288,388 +643,793 @@ def check_sign_validity(predicted_sign, current_results, previous_results, motio
     if sign_type == 'static':
         # For generic static signs, we want hands to be stable with minimal motion
         if len(motion_history) >= 2:
-            avg_motion = sum(motion_history[-2:]) / 2
+            avg_motion = motion_history.mean(2)
             return bool(avg_motion < MOTION_THRESHOLD * 1.5)
         return True
     
     elif sign_type == 'dynamic':
         # For generic dynamic signs, we expect some motion
         if len(motion_history) >= 2:
-            avg_motion = sum(motion_history[-2:]) / 2
+            avg_motion = motion_history.mean(2)
             return bool(avg_motion > MOTION_THRESHOLD * 0.5)
         return True
     
     return True
 
-def prediction_worker():
-    while True:
-        try:
-            client_id, sequence, current_results, previous_results, motion_history = prediction_queue.get()
-            if sequence is None:
-                break
-            
-            # Make prediction
-            prediction = model.predict(sequence, verbose=0)
-            scores = prediction[0]
-            
-            # Get the raw prediction first - before applying any weights
-            raw_max_score = float(np.max(scores))
-            raw_predicted_idx = int(np.argmax(scores))
-            raw_predicted_action = actions[raw_predicted_idx]
-            
-            # Add stricter validation for the iloveyou sign
-            # Only apply weight adjustments if the confidence isn't extremely high already
-            if raw_predicted_action == 'iloveyou' and raw_max_score < 0.95:
-                # Check if there's enough finger visibility for iloveyou sign
-                has_sufficient_fingers = False
-                
-                if current_results.right_hand_landmarks:
-                    # For "iloveyou" sign, typically the pinky, index and thumb should be extended
-                    # Check visibility and position of these key landmarks
-                    landmarks = current_results.right_hand_landmarks.landmark
-                    
-                    # More strict verification of finger positions
-                    if len(landmarks) >= 21:  # Make sure we have enough landmarks
-                        # Check positions of thumb tip, index tip, and pinky tip relative to palm
-                        thumb_tip = landmarks[4]    # Thumb tip
-                        index_tip = landmarks[8]    # Index finger tip
-                        middle_tip = landmarks[12]  # Middle finger tip
-                        ring_tip = landmarks[16]    # Ring finger tip
-                        pinky_tip = landmarks[20]   # Pinky tip
-                        wrist = landmarks[0]        # Wrist/palm center
-                        
-                        # Much stricter check for proper finger configuration
-                        if (index_tip.y < wrist.y - 0.1 and      # Index clearly extended up
-                            pinky_tip.y < wrist.y - 0.08 and     # Pinky clearly extended up
-                            abs(thumb_tip.x - wrist.x) > 0.08 and # Thumb clearly extended to side
-                            middle_tip.y > index_tip.y + 0.05 and # Middle clearly curled
-                            ring_tip.y > index_tip.y + 0.05):     # Ring clearly curled
-                            has_sufficient_fingers = True
-                
-                # If we don't have proper finger configuration, reduce the weight further
-                if not has_sufficient_fingers:
-                    SIGN_WEIGHTS['iloveyou'] = 0.7  # Much lower weight if fingers don't match
+def apply_prediction(client_id, scores, current_results, motion_history):
+    """Turn the action model's scores for one window into the client's last_prediction"""
+    # Per-call copy so concurrent workers don't see each other's weight adjustments
+    sign_weights = dict(SIGN_WEIGHTS)
+
+    # Get the raw prediction first - before applying any weights
+    raw_max_score = float(np.max(scores))
+    raw_predicted_idx = int(np.argmax(scores))
+    raw_predicted_action = actions[raw_predicted_idx]
+
+    # Add stricter validation for the iloveyou sign
+    # Only apply weight adjustments if the confidence isn't extremely high already
+    if raw_predicted_action == 'iloveyou' and raw_max_score < 0.95:
+        # Check if there's enough finger visibility for iloveyou sign
+        has_sufficient_fingers = False
+
+        if current_results.right_hand_landmarks:
+            # For "iloveyou" sign, typically the pinky, index and thumb should be extended
+            # Check visibility and position of these key landmarks
+            landmarks = current_results.right_hand_landmarks.landmark
+
+            # More strict verification of finger positions
+            if len(landmarks) >= 21:  # Make sure we have enough landmarks
+                # Check positions of thumb tip, index tip, and pinky tip relative to palm
+                thumb_tip = landmarks[4]    # Thumb tip
+                index_tip = landmarks[8]    # Index finger tip
+                middle_tip = landmarks[12]  # Middle finger tip
+                ring_tip = landmarks[16]    # Ring finger tip
+                pinky_tip = landmarks[20]   # Pinky tip
+                wrist = landmarks[0]        # Wrist/palm center
+
+                # Much stricter check for proper finger configuration
+                if (index_tip.y < wrist.y - 0.1 and      # Index clearly extended up
+                    pinky_tip.y < wrist.y - 0.08 and     # Pinky clearly extended up
+                    abs(thumb_tip.x - wrist.x) > 0.08 and # Thumb clearly extended to side
+                    middle_tip.y > index_tip.y + 0.05 and # Middle clearly curled
+                    ring_tip.y > index_tip.y + 0.05):     # Ring clearly curled
+                    has_sufficient_fingers = True
+
+        # If we don't have proper finger configuration, reduce the weight further
+        if not has_sufficient_fingers:
+            sign_weights['iloveyou'] = 0.7  # Much lower weight if fingers don't match
+        else:
+            sign_weights['iloveyou'] = 0.85  # Regular reduced weight with good finger config
+
+    # Apply weights to balance sign detection
+    weighted_scores = scores.copy()
+    for i, action in enumerate(actions):
+        weighted_scores[i] *= sign_weights.get(action, 1.0)
+
+    # Get top prediction
+    max_score = float(np.max(weighted_scores))
+    predicted_idx = int(np.argmax(weighted_scores))
+    predicted_action = actions[predicted_idx]
+
+    # Add extra validation for "iloveyou" sign to prevent over-detection
+    if predicted_action == 'iloveyou':
+        # If the raw score for "iloveyou" is very close to other signs, be more skeptical
+        if raw_predicted_action != 'iloveyou' and raw_max_score > 0.65:  # Lower threshold to reject more easily
+            # Use raw prediction instead
+            predicted_action = raw_predicted_action
+            predicted_idx = raw_predicted_idx
+            max_score = raw_max_score
+
+        # Require higher confidence threshold for iloveyou
+        if max_score < CONFIDENCE_THRESHOLD * 1.25:  # Even higher confidence needed (25% more)
+            # Reduce confidence even more
+            max_score *= 0.8  # Further reduce confidence for borderline cases
+
+    # Add protection against invalid predictions
+    if predicted_idx >= len(actions):
+        logger.error(f"Invalid prediction index: {predicted_idx}, max allowed: {len(actions)-1}")
+        # Fall back to highest unweighted score
+        predicted_idx = int(np.argmax(scores))
+        predicted_action = actions[predicted_idx]
+        max_score = float(scores[predicted_idx])
+
+    # Check if the predicted sign is valid based on its type (static vs dynamic)
+    is_valid_sign = check_sign_validity(predicted_action, current_results, motion_history)
+
+    # Add extra validation for "iloveyou" - require near stillness
+    if predicted_action == 'iloveyou' and is_valid_sign:
+        # If there's too much movement, it's probably not a static sign
+        recent_motion = motion_history.mean(3) if len(motion_history) >= 3 else 0
+        if recent_motion > MOTION_THRESHOLD * 0.5:  # Even stricter motion threshold (reduced from 0.8)
+            is_valid_sign = False
+
+    # Adjust confidence for invalid signs
+    if not is_valid_sign:
+        max_score *= 0.65  # Further reduce confidence for invalid signs (from 0.7)
+
+    # Convert NumPy types to Python types to avoid serialization issues
+    max_score = float(max_score)
+    is_valid_sign = bool(is_valid_sign)
+
+    # Store the original scores for confidence display
+    display_max_score = float(np.max(scores))
+
+    # Copy scores to a regular Python list to avoid NumPy serialization issues
+    scores_list = [float(s) for s in scores]
+
+    # Store the prediction with Python native types (not NumPy types)
+    session = sequence_buffer.get(client_id)
+    if session is None:
+        return  # Session was evicted while the prediction was queued
+    session['last_prediction'] = (predicted_action, display_max_score, scores_list, is_valid_sign, predicted_action)
+
+# Prometheus metrics (GET /metrics); gauges read the live objects at scrape time
+STAGE_SECONDS = metrics_registry.histogram(
+    'sign_stage_seconds', "Time spent in each request pipeline stage", ['route', 'stage'])
+QUEUE_WAIT_SECONDS = metrics_registry.histogram(
+    'sign_queue_wait_seconds', "Time a prediction window waited for an inference worker", ['model'])
+INFERENCE_SECONDS = metrics_registry.histogram(
+    'sign_inference_seconds', "Time of one model forward pass (batch) or streaming step", ['model', 'backend'])
+MODEL_INFERENCES = metrics_registry.counter(
+    'sign_model_inferences_total', "Windows (or streaming frames) run through each model", ['model', 'backend'])
+
+# Prediction worker pool settings
+PREDICTION_WORKERS = int(os.environ.get('PREDICTION_WORKERS', '2'))
+PREDICTION_BATCH_SIZE = int(os.environ.get('PREDICTION_BATCH_SIZE', '8'))
+PREDICTION_QUEUE_HIGH_WATER = int(os.environ.get('PREDICTION_QUEUE_HIGH_WATER', '64'))
+
+class PredictionScheduler:
+    """Pool of inference worker threads with per-client FIFO ordering.
+
+    Each client has at most one window in flight and one pending. A newer
+    window replaces the pending one (coalescing), so workers never spend time
+    on windows nobody cares about anymore. Predictions are still applied in
+    order, so a client's last_prediction never goes backwards. Once
+    ``high_water`` clients have pending windows, windows from further clients
+    are dropped to shed load. A worker takes the pending windows of up to
+    ``max_batch_size`` different clients and runs them through the model in a
+    single forward pass. TensorFlow releases the GIL during inference, so
+    threads are enough to keep several forward passes running.
+    """
+
+    def __init__(self, workers, max_batch_size, high_water):
+        self.workers = max(1, workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.high_water = max(1, high_water)
+        self._cond = threading.Condition()
+        self._pending = {}       # client_id -> newest queued work item
+        self._scheduled = set()  # clients that are ready or in flight
+        self._ready = deque()    # clients with queued work and nothing in flight
+        self._depth = 0
+        self._client_lag = {}
+        self._processed = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._batches = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._threads = [
+            threading.Thread(target=self._run, name=f'prediction-worker-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, client_id, sequence, current_results, motion_history):
+        """Queue a window for a client; returns False if it was dropped to shed load"""
+        item = (time.time(), sequence, current_results, motion_history)
+        with self._cond:
+            if client_id in self._pending:
+                # Supersede the client's older pending window
+                self._pending[client_id] = item
+                self._coalesced += 1
+                return True
+            if self._depth >= self.high_water:
+                self._dropped += 1
+                return False
+            self._pending[client_id] = item
+            self._depth += 1
+            if client_id not in self._scheduled:
+                self._scheduled.add(client_id)
+                self._ready.append(client_id)
+                self._cond.notify()
+            return True
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._ready:
+                self._cond.wait()
+            batch = []
+            while self._ready and len(batch) < self.max_batch_size:
+                client_id = self._ready.popleft()
+                batch.append((client_id, self._pending.pop(client_id)))
+                self._depth -= 1
+            return batch
+
+    def _finish_batch(self, batch, lags):
+        with self._cond:
+            for (client_id, _), lag in zip(batch, lags):
+                self._client_lag[client_id] = lag
+                self._processed += 1
+                self._total_lag += lag
+                self._max_lag = max(self._max_lag, lag)
+                if client_id in self._pending:
+                    self._ready.append(client_id)
+                    self._cond.notify()
                 else:
-                    SIGN_WEIGHTS['iloveyou'] = 0.85  # Regular reduced weight with good finger config
-            
-            # Apply weights to balance sign detection
-            weighted_scores = scores.copy()
-            for i, action in enumerate(actions):
-                weighted_scores[i] *= SIGN_WEIGHTS.get(action, 1.0)
-            
-            # Get top prediction
-            max_score = float(np.max(weighted_scores))
-            predicted_idx = int(np.argmax(weighted_scores))
-            predicted_action = actions[predicted_idx]
-            
-            # Add extra validation for "iloveyou" sign to prevent over-detection
-            if predicted_action == 'iloveyou':
-                # If the raw score for "iloveyou" is very close to other signs, be more skeptical
-                if raw_predicted_action != 'iloveyou' and raw_max_score > 0.65:  # Lower threshold to reject more easily
-                    # Use raw prediction instead
-                    predicted_action = raw_predicted_action
-                    predicted_idx = raw_predicted_idx
-                    max_score = raw_max_score
-                
-                # Require higher confidence threshold for iloveyou
-                if max_score < CONFIDENCE_THRESHOLD * 1.25:  # Even higher confidence needed (25% more)
-                    # Reduce confidence even more
-                    max_score *= 0.8  # Further reduce confidence for borderline cases
-            
-            # Add protection against invalid predictions
-            if predicted_idx >= len(actions):
-                logger.error(f"Invalid prediction index: {predicted_idx}, max allowed: {len(actions)-1}")
-                # Fall back to highest unweighted score
-                predicted_idx = int(np.argmax(scores))
-                predicted_action = actions[predicted_idx]
-                max_score = float(scores[predicted_idx])
-            
-            # Check if the predicted sign is valid based on its type (static vs dynamic)
-            is_valid_sign = check_sign_validity(predicted_action, current_results, previous_results, motion_history)
-            
-            # Add extra validation for "iloveyou" - require near stillness
-            if predicted_action == 'iloveyou' and is_valid_sign:
-                # If there's too much movement, it's probably not a static sign
-                recent_motion = sum(motion_history[-3:]) / 3 if len(motion_history) >= 3 else 0
-                if recent_motion > MOTION_THRESHOLD * 0.5:  # Even stricter motion threshold (reduced from 0.8)
-                    is_valid_sign = False
-            
-            # Adjust confidence for invalid signs
-            if not is_valid_sign:
-                max_score *= 0.65  # Further reduce confidence for invalid signs (from 0.7)
-            
-            # Convert NumPy types to Python types to avoid serialization issues
-            max_score = float(max_score)
-            is_valid_sign = bool(is_valid_sign)
-            
-            # Store the original scores for confidence display
-            display_max_score = float(np.max(scores))
-            
-            # Copy scores to a regular Python list to avoid NumPy serialization issues
-            scores_list = [float(s) for s in scores]
-            
-            # Store the prediction with Python native types (not NumPy types)
-            sequence_buffer[client_id]['last_prediction'] = (predicted_action, display_max_score, scores_list, is_valid_sign, predicted_action)
-            
-        except Exception as e:
-            logger.error(f"Error in prediction worker: {str(e)}")
-            import traceback
-            logger.error(f"Detailed error: {traceback.format_exc()}")
-        finally:
-            prediction_queue.task_done()
+                    self._scheduled.discard(client_id)
+            self._batches += 1
 
-# Start prediction worker thread
-prediction_thread = threading.Thread(target=prediction_worker, daemon=True)
-prediction_thread.start()
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            now = time.time()
+            lags = [now - item[0] for _, item in batch]
+            for lag in lags:
+                QUEUE_WAIT_SECONDS.observe(lag, model='action')
+            try:
+                sequences = np.concatenate([item[1] for _, item in batch])
+                start = time.perf_counter()
+                predictions = engine.predict(sequences)
+                INFERENCE_SECONDS.observe(time.perf_counter() - start, model='action', backend=engine.name)
+                MODEL_INFERENCES.inc(len(batch), model='action', backend=engine.name)
+                for (client_id, item), scores in zip(batch, predictions):
+                    _, _, current_results, motion_history = item
+                    try:
+                        apply_prediction(client_id, scores, current_results, motion_history)
+                    except Exception as e:
+                        logger.exception(f"Error applying prediction for client {client_id}: {str(e)}")
+            except Exception as e:
+                logger.exception(f"Error in prediction worker: {str(e)}")
+            finally:
+                self._finish_batch(batch, lags)
 
-@app.route('/')
-def home():
-    return render_template('index.html', language='english')
+    def forget(self, client_id):
+        """Drop lag bookkeeping for a client whose session has ended"""
+        with self._cond:
+            self._client_lag.pop(client_id, None)
 
-@app.route('/tagalog')
-def tagalog():
-    return render_template('index.html', language='tagalog')
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'max_batch_size': self.max_batch_size,
+                'queue_depth': self._depth,
+                'high_water': self.high_water,
+                'coalesced': self._coalesced,
+                'dropped': self._dropped,
+                'clients_pending': len(self._scheduled),
+                'processed': self._processed,
+                'batches': self._batches,
+                'avg_batch_size': round(self._processed / self._batches, 3) if self._batches else 0.0,
+                'avg_lag_ms': round(self._total_lag / self._processed * 1000, 3) if self._processed else 0.0,
+                'max_lag_ms': round(self._max_lag * 1000, 3),
+                'client_lag_ms': {
+                    str(client_id): round(lag * 1000, 3) for client_id, lag in self._client_lag.items()
+                }
+            }
 
-@app.route('/predict', methods=['POST'])
-def predict():
+# Start prediction worker threads
+prediction_scheduler = PredictionScheduler(PREDICTION_WORKERS, PREDICTION_BATCH_SIZE,
+                                           PREDICTION_QUEUE_HIGH_WATER)
+
+# Server-side overlay (annotated JPEG in the /predict response) is a debug
+# feature; by default only structured results are returned and clients draw
+# their own overlay
+OVERLAY_DEFAULT = os.environ.get('OVERLAY_DEFAULT', 'false').lower() in ('1', 'true', 'yes')
+
+def overlay_requested(data):
+    """Resolve the overlay flag from the request body or ?overlay= query parameter"""
+    value = data.get('overlay', request.args.get('overlay'))
+    if value is None:
+        return OVERLAY_DEFAULT
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+class StageTimer:
+    """Wall-clock timer for the stages of one request.
+
+    ``lap(name)`` charges the time since the previous lap (or the start) to
+    ``name``, so stages are timed without restructuring the code around them.
+    ``route`` labels the stages in the /metrics histograms.
+    """
+
+    def __init__(self, route=''):
+        self.route = route
+        self.start = self._last = time.perf_counter()
+        self.stages = {}
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def total(self):
+        return self._last - self.start
+
+    def as_ms(self):
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        timings['total'] = round(self.total() * 1000, 3)
+        return timings
+
+class StageStats:
+    """Running per-stage latency totals across requests, reported by /stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, timer):
+        stages = list(timer.stages.items()) + [('total', timer.total())]
+        for name, seconds in stages:
+            STAGE_SECONDS.observe(seconds, route=timer.route, stage=name)
+        with self._lock:
+            for name, seconds in stages:
+                count, total, worst = self._stages.get(name, (0, 0.0, 0.0))
+                self._stages[name] = (count + 1, total + seconds, max(worst, seconds))
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': count,
+                    'avg_ms': round(total / count * 1000, 3),
+                    'max_ms': round(worst * 1000, 3)
+                } for name, (count, total, worst) in self._stages.items()
+            }
+
+stage_stats = StageStats()
+
+metrics_registry.gauge('sign_ready', "1 once the model is loaded and warmed up",
+                       function=lambda: int(startup.ready))
+metrics_registry.gauge('sign_active_sessions', "Live client sessions",
+                       function=lambda: sequence_buffer.stats()['live_sessions'])
+metrics_registry.gauge('sign_holistic_trackers', "Per-client Holistic trackers",
+                       function=lambda: holistic_pool.stats()['trackers'])
+metrics_registry.gauge('sign_queue_depth', "Work items waiting per queue", ['queue'],
+                       function=lambda: {('prediction',): prediction_scheduler.stats()['queue_depth']})
+metrics_registry.counter('sign_prediction_windows_total', "Prediction windows by outcome", ['outcome'],
+                         function=lambda: {(outcome,): prediction_scheduler.stats()[outcome]
+                                           for outcome in ('processed', 'coalesced', 'dropped')})
+
+# Warmup: run the action model at every batch size the scheduler produces and
+# initialize spare Holistic trackers before /ready reports ready
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+WARMUP_HOLISTIC_SPARES = int(os.environ.get('WARMUP_HOLISTIC_SPARES', '1'))
+
+def run_warmup():
+    """Warm up the action model and MediaPipe, then flip readiness"""
     try:
-        # Get the image data from the request
-        data = request.json
-        image_data = data['image'].split(',')[1]
-        image_bytes = base64.b64decode(image_data)
-        client_id = data.get('clientId', 'default')
-        language = data.get('language', 'english')
-        
-        # Initialize sequence buffer for new clients
-        if client_id not in sequence_buffer:
-            sequence_buffer[client_id] = init_client_buffer()
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        # Convert to RGB for MediaPipe
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Make detection
-        results = holistic.process(frame_rgb)
-        
-        # Get previous results for motion calculation
-        previous_results = sequence_buffer[client_id].get('previous_results')
-        
-        # Calculate hand motion if both current and previous frames have hands
-        motion_value = 0
-        if previous_results and results:
-            left_motion = calculate_hand_motion(results.left_hand_landmarks, previous_results.left_hand_landmarks) if results.left_hand_landmarks and previous_results.left_hand_landmarks else 0
-            right_motion = calculate_hand_motion(results.right_hand_landmarks, previous_results.right_hand_landmarks) if results.right_hand_landmarks and previous_results.right_hand_landmarks else 0
-            motion_value = max(left_motion, right_motion)
-            
-        # Store motion value in history
-        sequence_buffer[client_id]['motion_history'].append(motion_value)
-        
-        # Store current results for next frame
-        sequence_buffer[client_id]['previous_results'] = results
-        
-        # Check if hands are present - use a much more lenient check
-        hands_present = has_hands(results)
-        
-        # Extract keypoints
-        keypoints = extract_keypoints(results)
-        if keypoints is None:
-            return jsonify({
-                'error': 'Failed to extract keypoints',
-                'success': False
-            }), 400
-        
-        # Add keypoints to sequence buffer
-        sequence_buffer[client_id]['frames'].append(keypoints)
+        if WARMUP_ENABLED:
+            with startup.phase('warmup_model'):
+                timings = warm_up(engine, (SEQUENCE_LENGTH, KEYPOINT_SIZE), warmup_batch_sizes(PREDICTION_BATCH_SIZE))
+                if streaming_engine is not None:
+                    streaming_engine.new_state().step(np.zeros(KEYPOINT_SIZE, dtype=np.float32))
+            logger.info(f"Warmup: action model batch sizes (ms) {timings}")
+            with startup.phase('warmup_holistic'):
+                blank = np.zeros((480, 640, 3), dtype=np.uint8)
+                for _ in range(WARMUP_HOLISTIC_SPARES):
+                    holistic = create_holistic()
+                    holistic.process(blank)
+                    holistic_pool.add_spare(holistic)
+            logger.info(f"Warmup: {WARMUP_HOLISTIC_SPARES} spare Holistic trackers initialized")
+        startup.set_ready()
+        logger.info(f"Server ready: {startup.stats()}")
+    except Exception as e:
+        startup.fail(e)
+        logger.error(f"Warmup failed, server will not report ready: {e}")
+
+threading.Thread(target=run_warmup, name='warmup', daemon=True).start()
+
+def process_frame(client_id, session, frame, timer):
+    """Run one RGB frame (from decode_frame) through the client's pipeline and update its session.
+
+    Returns (predicted_action, confidence, is_valid_sign, english_prediction)
+    for the frame, or None if keypoints could not be extracted. Stage times
+    are recorded on ``timer``.
+
+    Frames of one session are processed one at a time: overlapping requests
+    for the same clientId (e.g. /predict next to /ws) would otherwise share
+    the frame buffer slot, the motion history and the sentence state.
+    """
+    with session['lock']:
+        return _process_frame(client_id, session, frame, timer)
+
+def _process_frame(client_id, session, frame, timer):
+    """process_frame with the session lock held"""
+    # Make detection on this client's own tracker
+    with holistic_pool.checkout(client_id) as holistic:
+        results = holistic.process(frame)
+    timer.lap('holistic')
+    
+    # Check if hands are present - use a much more lenient check
+    hands_present = has_hands(results)
+    
+    # Extract keypoints straight into the client's frame ring buffer
+    frames = session['frames']
+    keypoints = extract_keypoints(results, frames.next_row())
+    if keypoints is None:
+        return None
+    
+    # Add keypoints to sequence buffer
+    frames.commit()
+    
+    # Hand motion against the previous frame's keypoints (0 if a hand is missing in either)
+    session['motion_history'].append(hand_motion(keypoints, frames.latest(1)))
+    timer.lap('keypoints')
+    
+    # Streaming mode: advance this client's recurrent state with just the newest frame
+    stream = session['stream']
+    if stream is not None:
+        start = time.perf_counter()
+        stream_scores = stream.step(keypoints)
+        INFERENCE_SECONDS.observe(time.perf_counter() - start, model='action', backend='streaming')
+        MODEL_INFERENCES.inc(model='action', backend='streaming')
+        if len(frames) == SEQUENCE_LENGTH:
+            apply_prediction(client_id, stream_scores, results, session['motion_history'].copy())
+    
+    timer.lap('inference')
+    
+    # Get current prediction
+    predicted_action_display, max_score, scores, is_valid_sign, english_model_prediction = session['last_prediction']
+    
+    # Track empty frames (no hands) - but be more lenient
+    if not hands_present:
+        session['empty_frame_counter'] += 1
+    else:
+        session['empty_frame_counter'] = 0
         
-        # Get current prediction
-        predicted_action_display, max_score, scores, is_valid_sign, english_model_prediction = sequence_buffer[client_id]['last_prediction']
+    # Reset if too many empty frames - increased from 5 to be more lenient
+    if session['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
+        session['predictions'].clear()
+        session['current_action'] = None
+        session['current_action_start_time'] = None
+        session['consecutive_predictions'] = 0
         
-        # Track empty frames (no hands) - but be more lenient
-        if not hands_present:
-            sequence_buffer[client_id]['empty_frame_counter'] += 1
-        else:
-            sequence_buffer[client_id]['empty_frame_counter'] = 0
-            
-        # Reset if too many empty frames - increased from 5 to be more lenient
-        if sequence_buffer[client_id]['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
-            sequence_buffer[client_id]['predictions'].clear()
-            sequence_buffer[client_id]['current_action'] = None
-            sequence_buffer[client_id]['current_action_start_time'] = None
-            sequence_buffer[client_id]['consecutive_predictions'] = 0
+    # If we have enough frames, queue a new prediction
+    if len(frames) == SEQUENCE_LENGTH:
+        # Only queue a window every `stride` frames; consecutive windows overlap almost entirely
+        session['frames_since_inference'] += 1
+        if stream is None and session['frames_since_inference'] >= inference_stride(session['motion_history']):
+            session['frames_since_inference'] = 0
             
-        # If we have enough frames, queue a new prediction
-        if len(sequence_buffer[client_id]['frames']) == 30:
-            sequence = np.array(list(sequence_buffer[client_id]['frames']))
-            sequence = np.expand_dims(sequence, axis=0)
+            # Single copy of the window, since the buffer keeps changing while queued
+            sequence = frames.snapshot()
             
             # Always make predictions, even if hands might not be perfectly detected
-            prediction_queue.put((
+            prediction_scheduler.put(
                 client_id, 
                 sequence, 
                 results, 
-                previous_results, 
-                list(sequence_buffer[client_id]['motion_history'])
-            ))
+                session['motion_history'].copy()
+            )
+        
+        # Add prediction to buffer
+        if scores is not None:
+            # Still consider all predictions, even if sign validation is uncertain
+            session['predictions'].append(np.argmax(scores))
             
-            # Add prediction to buffer
-            if scores is not None:
-                # Still consider all predictions, even if sign validation is uncertain
-                sequence_buffer[client_id]['predictions'].append(np.argmax(scores))
+            # Check for high confidence predictions
+            if max_score >= HIGH_CONFIDENCE_THRESHOLD:
+                current_action = predicted_action_display
+                
+                # Check cooldown for "iloveyou" sign to prevent rapid repeated detection
+                current_time = time.time()
+                if current_action == 'iloveyou':
+                    last_iloveyou_time = session['last_iloveyou_time']
+                    cooldown_period = session['iloveyou_cooldown']
+                    
+                    # If we're still in cooldown, don't allow another "iloveyou" detection
+                    if current_time - last_iloveyou_time < cooldown_period:
+                        # Skip this detection
+                        current_action = None
+                    else:
+                        # Update the last detection time
+                        session['last_iloveyou_time'] = current_time
                 
-                # Check for high confidence predictions
-                if max_score >= HIGH_CONFIDENCE_THRESHOLD:
-                    current_action = predicted_action_display
+                # Only add to sentence if it's valid and not in cooldown
+                if current_action and (len(session['sentence']) == 0 or 
+                    current_action != session['sentence'][-1]):
+                    session['sentence'].append(current_action)
+                    session['last_action'] = current_action
+                    # Reset tracking for next prediction
+                    session['current_action'] = None
+                    session['consecutive_predictions'] = 0
                     
-                    # Check cooldown for "iloveyou" sign to prevent rapid repeated detection
+            # Check if we have consistent predictions
+            elif len(session['predictions']) >= 3:  # Reduced from 5 for even faster detection
+                # Use a majority vote from recent predictions
+                recent_preds = list(session['predictions'])[-3:]
+                unique_preds, counts = np.unique(recent_preds, return_counts=True)
+                majority_idx = np.argmax(counts)
+                majority_prediction = unique_preds[majority_idx]
+                majority_count = counts[majority_idx]
+                
+                # If we have a majority and confidence is high enough - be more lenient
+                if majority_count >= 2 and max_score > CONFIDENCE_THRESHOLD * 0.9:  # Reduced threshold
+                    current_action = actions[majority_prediction]
                     current_time = time.time()
+                    
+                    # Check cooldown for "iloveyou" sign
                     if current_action == 'iloveyou':
-                        last_iloveyou_time = sequence_buffer[client_id]['last_iloveyou_time']
-                        cooldown_period = sequence_buffer[client_id]['iloveyou_cooldown']
+                        last_iloveyou_time = session['last_iloveyou_time']
+                        cooldown_period = session['iloveyou_cooldown']
                         
                         # If we're still in cooldown, don't allow another "iloveyou" detection
                         if current_time - last_iloveyou_time < cooldown_period:
                             # Skip this detection
                             current_action = None
-                        else:
-                            # Update the last detection time
-                            sequence_buffer[client_id]['last_iloveyou_time'] = current_time
                     
-                    # Only add to sentence if it's valid and not in cooldown
-                    if current_action and (len(sequence_buffer[client_id]['sentence']) == 0 or 
-                        current_action != sequence_buffer[client_id]['sentence'][-1]):
-                        sequence_buffer[client_id]['sentence'].append(current_action)
-                        sequence_buffer[client_id]['last_action'] = current_action
-                        # Reset tracking for next prediction
-                        sequence_buffer[client_id]['current_action'] = None
-                        sequence_buffer[client_id]['consecutive_predictions'] = 0
-                        
-                # Check if we have consistent predictions
-                elif len(sequence_buffer[client_id]['predictions']) >= 3:  # Reduced from 5 for even faster detection
-                    # Use a majority vote from recent predictions
-                    recent_preds = list(sequence_buffer[client_id]['predictions'])[-3:]
-                    unique_preds, counts = np.unique(recent_preds, return_counts=True)
-                    majority_idx = np.argmax(counts)
-                    majority_prediction = unique_preds[majority_idx]
-                    majority_count = counts[majority_idx]
-                    
-                    # If we have a majority and confidence is high enough - be more lenient
-                    if majority_count >= 2 and max_score > CONFIDENCE_THRESHOLD * 0.9:  # Reduced threshold
-                        current_action = actions[majority_prediction]
-                        current_time = time.time()
-                        
-                        # Check cooldown for "iloveyou" sign
-                        if current_action == 'iloveyou':
-                            last_iloveyou_time = sequence_buffer[client_id]['last_iloveyou_time']
-                            cooldown_period = sequence_buffer[client_id]['iloveyou_cooldown']
+                    # Only proceed if we have a valid action after cooldown check
+                    if current_action:
+                        # Initialize or update prediction tracking
+                        if session['current_action'] != current_action:
+                            session['consecutive_predictions'] = 1
+                            session['current_action'] = current_action
+                            session['current_action_start_time'] = current_time
+                        else:
+                            session['consecutive_predictions'] += 1
                             
-                            # If we're still in cooldown, don't allow another "iloveyou" detection
-                            if current_time - last_iloveyou_time < cooldown_period:
-                                # Skip this detection
-                                current_action = None
-                        
-                        # Only proceed if we have a valid action after cooldown check
-                        if current_action:
-                            # Initialize or update prediction tracking
-                            if sequence_buffer[client_id]['current_action'] != current_action:
-                                sequence_buffer[client_id]['consecutive_predictions'] = 1
-                                sequence_buffer[client_id]['current_action'] = current_action
-                                sequence_buffer[client_id]['current_action_start_time'] = current_time
-                            else:
-                                sequence_buffer[client_id]['consecutive_predictions'] += 1
+                            # Only update the sentence if we have enough consecutive predictions
+                            # and enough time has passed (less strict now)
+                            if (session['consecutive_predictions'] >= MIN_CONSECUTIVE_PREDICTIONS - 1 and
+                                current_time - session['current_action_start_time'] >= MIN_PREDICTION_TIME * 0.8):
                                 
-                                # Only update the sentence if we have enough consecutive predictions
-                                # and enough time has passed (less strict now)
-                                if (sequence_buffer[client_id]['consecutive_predictions'] >= MIN_CONSECUTIVE_PREDICTIONS - 1 and
-                                    current_time - sequence_buffer[client_id]['current_action_start_time'] >= MIN_PREDICTION_TIME * 0.8):
+                                # Add to sentence if it's a new sign or different from the last one
+                                if (len(session['sentence']) == 0 or 
+                                    current_action != session['sentence'][-1]):
                                     
-                                    # Add to sentence if it's a new sign or different from the last one
-                                    if (len(sequence_buffer[client_id]['sentence']) == 0 or 
-                                        current_action != sequence_buffer[client_id]['sentence'][-1]):
+                                    # For "iloveyou", update the last detection time
+                                    if current_action == 'iloveyou':
+                                        session['last_iloveyou_time'] = current_time
                                         
-                                        # For "iloveyou", update the last detection time
-                                        if current_action == 'iloveyou':
-                                            sequence_buffer[client_id]['last_iloveyou_time'] = current_time
-                                            
-                                        sequence_buffer[client_id]['sentence'].append(current_action)
-                                        sequence_buffer[client_id]['last_action'] = current_action
-                                        # Reset for next prediction
-                                        sequence_buffer[client_id]['current_action'] = None
-                                        sequence_buffer[client_id]['consecutive_predictions'] = 0
-            
-            # Handle case when hands might not be perfectly detected but we're still getting predictions
-            elif not hands_present and sequence_buffer[client_id]['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
-                # Only reset completely after a longer period with no hands
-                predicted_action_display = 'Waiting for hands...'
-                max_score = 0.0
-                is_valid_sign = False
-                english_model_prediction = 'Waiting for hands...'
-                sequence_buffer[client_id]['last_prediction'] = (predicted_action_display, max_score, None, is_valid_sign, english_model_prediction)
+                                    session['sentence'].append(current_action)
+                                    session['last_action'] = current_action
+                                    # Reset for next prediction
+                                    session['current_action'] = None
+                                    session['consecutive_predictions'] = 0
         
-        # Add prediction text and background for better visibility
-        cv2.rectangle(frame, (0,0), (frame.shape[1], 40), (245, 117, 16), -1)
-        sentence_text = ' '.join(sequence_buffer[client_id]['sentence'])
-        cv2.putText(frame, sentence_text, (3,30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+        # Handle case when hands might not be perfectly detected but we're still getting predictions
+        elif not hands_present and session['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
+            # Only reset completely after a longer period with no hands
+            predicted_action_display = 'Waiting for hands...'
+            max_score = 0.0
+            is_valid_sign = False
+            english_model_prediction = 'Waiting for hands...'
+            session['last_prediction'] = (predicted_action_display, max_score, None, is_valid_sign, english_model_prediction)
+    timer.lap('sentence')
+    
+    return predicted_action_display, max_score, is_valid_sign, english_model_prediction
+
+def render_overlay(frame, session, predicted_action, max_score, is_valid_sign):
+    """Draw the sentence, prediction and motion onto ``frame`` and return it as JPEG bytes"""
+    # Back to BGR in place for OpenCV drawing and encoding (debug path only)
+    cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=frame)
+    
+    # Add prediction text and background for better visibility
+    cv2.rectangle(frame, (0,0), (frame.shape[1], 40), (245, 117, 16), -1)
+    sentence_text = ' '.join(session['sentence'])
+    cv2.putText(frame, sentence_text, (3,30), 
+               cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+    
+    # Add prediction and confidence
+    prediction_text = f"{predicted_action} ({max_score:.2f})"
+    color = (0, 255, 0) if is_valid_sign else (0, 165, 255)  # Green if valid, orange if not
+    cv2.putText(frame, prediction_text, (frame.shape[1] - 250, 70), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    
+    # Add motion indicator (for debugging)
+    motion_value = session['motion_history'].latest()
+    motion_text = f"Motion: {motion_value:.4f}"
+    cv2.putText(frame, motion_text, (10, frame.shape[0] - 10), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    
+    # Encode with reduced quality
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return buffer.tobytes()
+
+def localize_prediction(session, predicted_action, language):
+    """Prediction and sentence as shown to the client in ``language``"""
+    display_prediction = predicted_action
+    display_sentence = list(session['sentence'])
+    
+    if language == 'tagalog' and predicted_action in tagalog_labels:
+        display_prediction = tagalog_labels[predicted_action]
+        display_sentence = [tagalog_labels[sign] for sign in session['sentence'] if sign in tagalog_labels]
         
-        # Add prediction and confidence
-        prediction_text = f"{predicted_action_display} ({max_score:.2f})"
-        color = (0, 255, 0) if is_valid_sign else (0, 165, 255)  # Green if valid, orange if not
-        cv2.putText(frame, prediction_text, (frame.shape[1] - 250, 70), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    # Special case for waiting message
+    if predicted_action == 'Waiting for hands...':
+        display_prediction = 'Naghihintay ng kamay...' if language == 'tagalog' else predicted_action
+    
+    return display_prediction, display_sentence
+
+@app.route('/')
+def home():
+    return render_template('index.html', language='english')
+
+@app.route('/tagalog')
+def tagalog():
+    return render_template('index.html', language='tagalog')
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    try:
+        timer = StageTimer('/predict')
         
-        # Add motion indicator (for debugging)
-        motion_value = 0 if not sequence_buffer[client_id]['motion_history'] else sequence_buffer[client_id]['motion_history'][-1]
-        motion_text = f"Motion: {motion_value:.4f}"
-        cv2.putText(frame, motion_text, (10, frame.shape[0] - 10), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Get the image data from the request
+        data = request.json
+        client_id = data.get('clientId', 'default')
+        language = data.get('language', 'english')
         
-        # Convert frame back to base64 with reduced quality
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
+        # Decode straight to an RGB frame of at most DECODE_TARGET_WIDTH
+        try:
+            image_bytes = decode_base64(data['image'])
+            timer.lap('base64')
+            session_recorder.add(client_id, image_bytes, language=language, source='/predict')
+            frame = decode_frame(image_bytes, DECODE_TARGET_WIDTH, timer=timer)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'success': False}), 400
         
-        # Format response depending on language
-        display_prediction = predicted_action_display
-        display_sentence = list(sequence_buffer[client_id]['sentence'])
+        # Get (or create) this client's session
+        session = sequence_buffer.get_or_create(client_id)
         
-        if language == 'tagalog' and predicted_action_display in tagalog_labels:
-            display_prediction = tagalog_labels[predicted_action_display]
-            display_sentence = [tagalog_labels[sign] for sign in sequence_buffer[client_id]['sentence'] if sign in tagalog_labels]
-            
-        # Special case for waiting message
-        if predicted_action_display == 'Waiting for hands...':
-            display_prediction = 'Naghihintay ng kamay...' if language == 'tagalog' else predicted_action_display
+        state = process_frame(client_id, session, frame, timer)
+        if state is None:
+            return jsonify({
+                'error': 'Failed to extract keypoints',
+                'success': False
+            }), 400
+        predicted_action_display, max_score, is_valid_sign, english_model_prediction = state
         
-        # Fix the NumPy bool_ serialization issue - convert to Python bool
-        is_valid_sign_python = bool(is_valid_sign)
+        # Format response depending on language
+        display_prediction, display_sentence = localize_prediction(session, predicted_action_display, language)
         
         # Return response with converted Python values instead of NumPy types
-        return jsonify({
+        response = {
             'prediction': display_prediction,
             'english_prediction': english_model_prediction,
             'confidence': float(max_score),
-            'frame': f'data:image/jpeg;base64,{frame_base64}',
-            'frames_collected': int(len(sequence_buffer[client_id]['frames'])),
+            'frames_collected': len(session['frames']),
             'sentence': display_sentence,
-            'is_valid_sign': is_valid_sign_python,
+            'is_valid_sign': bool(is_valid_sign),
+            'motion': session['motion_history'].latest(),
             'success': True
-        })
+        }
+        
+        # Debug mode: draw the overlay server-side and send the annotated frame back
+        if overlay_requested(data):
+            frame_jpeg = render_overlay(frame, session, predicted_action_display, max_score, is_valid_sign)
+            response['frame'] = 'data:image/jpeg;base64,' + base64.b64encode(frame_jpeg).decode('utf-8')
+            timer.lap('overlay')
+            response['timings'] = timer.as_ms()
+        
+        body = jsonify(response)
+        timer.lap('serialize')
+        stage_stats.record(timer)
+        log_event(logger, '/predict', "Prediction", client_id=client_id, prediction=predicted_action_display,
+                  confidence=round(float(max_score), 4), frames_collected=len(session['frames']),
+                  timings_ms=timer.as_ms())
+        return body
         
     except Exception as e:
-        logger.error(f"Error in predict endpoint: {str(e)}")
+        # The traceback is formatted on the logging thread, not here
+        logger.exception(f"Error in predict endpoint: {str(e)}")
+        
         # Give more detailed error information
         import traceback
-        error_details = traceback.format_exc()
-        logger.error(f"Detailed error: {error_details}")
-        
         return jsonify({
             'error': str(e),
-            'details': error_details if app.debug else 'Enable debug mode for details',
+            'details': traceback.format_exc() if app.debug else 'Enable debug mode for details',
             'success': False
         }), 500
 
+def parse_flag(value, default=False):
+    """Boolean option from a query string or control message value"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+@sock.route('/ws')
+def predict_stream(ws):
+    """Stream frames over one WebSocket connection per client session.
+
+    The client sends each frame as a binary message of JPEG (or PNG) bytes.
+    For every frame the server replies with a compact JSON text message:
+
+        {"seq": 12, "prediction": "hello", "confidence": 0.93,
+         "is_valid_sign": true, "frames_collected": 30}
+
+    ``sentence`` is only included when it changes. With overlays enabled the
+    annotated frame follows as a binary JPEG message. Options come from the
+    query string (``?language=tagalog&overlay=1&clientId=...``) and can be
+    changed mid-stream with a JSON text message such as {"overlay": false}.
+    Without a clientId the session lives exactly as long as the connection.
+    """
+    client_id = request.args.get('clientId')
+    owns_session = client_id is None
+    if owns_session:
+        client_id = f'ws-{uuid.uuid4().hex}'
+    language = request.args.get('language', 'english')
+    overlay = parse_flag(request.args.get('overlay'))
+    last_sentence = None
+    seq = 0
+    logger.info(f"WebSocket stream opened for client {client_id}")
+    
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            
+            # A failure on one message is reported to the client and the stream stays open
+            try:
+                # Text messages update the stream options
+                if isinstance(message, str):
+                    try:
+                        options = json.loads(message)
+                        language = options.get('language', language)
+                        overlay = parse_flag(options.get('overlay'), overlay)
+                    except (ValueError, AttributeError, TypeError):
+                        ws.send(json.dumps({'error': 'Invalid control message', 'success': False}))
+                    continue
+            
+                seq += 1
+                session_recorder.add(client_id, message, language=language, source='/ws')
+                timer = StageTimer('/ws')
+                try:
+                    frame = decode_frame(message, DECODE_TARGET_WIDTH, timer=timer)
+                except ValueError:
+                    ws.send(json.dumps({'seq': seq, 'error': 'Invalid image', 'success': False}))
+                    continue
+            
+                session = sequence_buffer.get_or_create(client_id)
+                state = process_frame(client_id, session, frame, timer)
+                if state is None:
+                    ws.send(json.dumps({'seq': seq, 'error': 'Failed to extract keypoints', 'success': False}))
+                    continue
+                predicted_action, max_score, is_valid_sign, english_prediction = state
+                display_prediction, display_sentence = localize_prediction(session, predicted_action, language)
+            
+                reply = {
+                    'seq': seq,
+                    'prediction': display_prediction,
+                    'confidence': round(float(max_score), 4),
+                    'is_valid_sign': bool(is_valid_sign),
+                    'frames_collected': len(session['frames'])
+                }
+                if language == 'tagalog':
+                    reply['english_prediction'] = english_prediction
+                if display_sentence != last_sentence:
+                    reply['sentence'] = display_sentence
+                    last_sentence = display_sentence
+                payload = json.dumps(reply, separators=(',', ':'))
+                timer.lap('serialize')
+                ws.send(payload)
+                timer.lap('send')
+            
+                if overlay:
+                    ws.send(render_overlay(frame, session, predicted_action, max_score, is_valid_sign))
+                    timer.lap('overlay')
+                stage_stats.record(timer)
+                log_event(logger, '/ws', "Prediction", client_id=client_id, seq=seq, prediction=predicted_action,
+                          confidence=reply['confidence'], frames_collected=reply['frames_collected'])
+            except ConnectionClosed:
+                raise
+            except Exception as e:
+                logger.exception(f"Error processing WebSocket message {seq} for client {client_id}: {str(e)}")
+                ws.send(json.dumps({'seq': seq, 'error': 'Failed to process frame', 'success': False}))
+    except ConnectionClosed:
+        pass
+    except Exception as e:
+        logger.exception(f"Error in WebSocket stream for client {client_id}: {str(e)}")
+    finally:
+        logger.info(f"WebSocket stream closed for client {client_id} after {seq} frames")
+        if owns_session:
+            sequence_buffer.discard(client_id)
+
 @app.route('/forward_to_angular', methods=['POST'])
 def forward_to_angular():
     """Endpoint to forward messages to the Angular app"""
@@ -721,5 +1481,80 @@ def forward_to_angular():
         logger.error(f"Error forwarding message to Angular: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/live', methods=['GET'])
+def live():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'alive', 'uptime_s': startup.stats()['uptime_s']})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: model loaded and warmup finished (503 until then)"""
+    state = startup.stats()
+    return jsonify(state), 200 if state['ready'] else 503
+
+@app.route('/record', methods=['POST'])
+def record():
+    """Start or stop recording a client's frames (requires RECORD_ENABLED).
+
+    POST {"clientId": "...", "action": "start" | "stop"}. Stopping writes the
+    frames received in between to RECORD_DIR for replay_session.py.
+    """
+    if not RECORD_ENABLED:
+        return jsonify({'success': False, 'error': 'Recording is disabled (set RECORD_ENABLED=1)'}), 403
+    data = request.get_json(silent=True) or {}
+    client_id = data.get('clientId')
+    if not client_id:
+        return jsonify({'success': False, 'error': 'clientId is required'}), 400
+    if data.get('action') == 'start':
+        if not session_recorder.start(client_id):
+            return jsonify({'success': False, 'error': 'Already recording this client'}), 409
+        return jsonify({'success': True, 'recording': client_id})
+    if data.get('action') == 'stop':
+        saved = session_recorder.stop(client_id)
+        if saved is None:
+            return jsonify({'success': False, 'error': 'Not recording this client'}), 404
+        path, frames = saved
+        logger.info(f"Saved recording of client {client_id}: {frames} frames to {path}")
+        return jsonify({'success': True, 'path': path, 'frames': frames})
+    return jsonify({'success': False, 'error': "action must be 'start' or 'stop'"}), 400
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for this process (text exposition format)"""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/log_level', methods=['GET', 'POST'])
+def log_level():
+    """Read or change logging at runtime for this process.
+
+    POST {"level": "DEBUG", "logger": "werkzeug", "sample_rates": {"/predict": 0.1}};
+    every key is optional and ``logger`` defaults to the root logger.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            if 'level' in data:
+                set_level(data['level'], data.get('logger'))
+            for route, rate in (data.get('sample_rates') or {}).items():
+                set_sample_rate(route, rate)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'logging': logging_stats(), 'success': True})
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Runtime statistics for capacity planning"""
+    return jsonify({
+        'logging': logging_stats(),
+        'startup': startup.stats(),
+        'sessions': sequence_buffer.stats(),
+        'holistic': holistic_pool.stats(),
+        'predictions': prediction_scheduler.stats(),
+        'stages': stage_stats.stats(),
+        'success': True
+    })
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5008, host='0.0.0.0', threaded=True) 
\ No newline at end of file
+    # Flask development server; use `gunicorn -c gunicorn.conf.py` in production.
+    # FLASK_DEBUG=1 enables the debugger and reloader (which loads the model twice)
+    app.run(debug=os.environ.get('FLASK_DEBUG', '0').lower() in ('1', 'true', 'yes'), port=5008, host='0.0.0.0', threaded=True) 
\ No newline at end of file
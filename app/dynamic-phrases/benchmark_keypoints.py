@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+benchmark_keypoints.py - Micro-benchmark for Holistic keypoint extraction
+
+Compares the original list-based extract_keypoints with the preallocated
+extract_keypoints_into path on synthetic MediaPipe landmark protobufs (the same
+types holistic.process returns), and checks both produce the same values.
+
+Usage:
+    python benchmark_keypoints.py [--iterations 2000] [--face-stride 1]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from keypoints import KEYPOINT_SIZE, extract_keypoints_into, extract_keypoints_reference
+
+
+def make_landmark_list(count, rng, with_visibility=False):
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in rng.random((count, 3)):
+        landmark = landmark_list.landmark.add(x=x, y=y, z=z)
+        if with_visibility:
+            landmark.visibility = rng.random()
+    return landmark_list
+
+
+def make_results(rng, face=True, left_hand=True, right_hand=True):
+    return SimpleNamespace(
+        pose_landmarks=make_landmark_list(33, rng, with_visibility=True),
+        face_landmarks=make_landmark_list(468, rng) if face else None,
+        left_hand_landmarks=make_landmark_list(21, rng) if left_hand else None,
+        right_hand_landmarks=make_landmark_list(21, rng) if right_hand else None
+    )
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Holistic keypoint extraction")
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--face-stride', type=int, default=1,
+                        help="Face landmark stride for the fast path (0 skips the face block)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scenarios = {
+        'full body': make_results(rng),
+        'no left hand': make_results(rng, left_hand=False),
+        'hands only': make_results(rng, face=False)
+    }
+    row = np.empty(KEYPOINT_SIZE, dtype=np.float32)
+
+    print(f"{'scenario':14s} {'reference':>12s} {'fast':>12s} {'speedup':>8s}")
+    for name, results in scenarios.items():
+        if args.face_stride == 1:
+            expected = extract_keypoints_reference(results).astype(np.float32)
+            actual = extract_keypoints_into(results, row, face_stride=1)
+            assert np.array_equal(expected, actual), f"Fast path differs from reference for '{name}'"
+
+        reference = time_per_call(lambda: extract_keypoints_reference(results), args.iterations)
+        fast = time_per_call(lambda: extract_keypoints_into(results, row, args.face_stride), args.iterations)
+        print(f"{name:14s} {reference * 1e6:10.1f}us {fast * 1e6:10.1f}us {reference / fast:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
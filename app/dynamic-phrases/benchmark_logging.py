@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+benchmark_logging.py - Request throughput under different logging setups
+
+Simulates request threads that each handle a /predict-sized payload (a
+base64 JPEG of --payload-kb) and log the way the services do:
+
+    print    the old static-signs path: print the raw request and a line
+             per stage, synchronously to stdout
+    sync     logging.basicConfig with one INFO line per request
+    queue    logsetup.configure_logging: JSON through the non-blocking
+             queue, payload fields truncated, every request logged
+    sampled  as queue, with /predict sampled at --sample-rate
+
+Each mode runs in a child process whose stdout is a pipe drained by this
+process, like a container's stdout under a log driver. --drain-delay makes
+the reader slower (seconds per 64 KB chunk) to mimic a backed-up driver.
+
+    python benchmark_logging.py --threads 8 --duration 5
+    python benchmark_logging.py --modes print sampled --drain-delay 0.001
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import logsetup
+
+
+def worker(mode, threads, duration, payload_kb, sample_rate):
+    """Child process: run the simulated request loop and report on stderr"""
+    rng = np.random.default_rng(0)
+    image = base64.b64encode(rng.bytes(payload_kb * 1024)).decode('ascii')
+    data = {'image': f'data:image/jpeg;base64,{image}', 'clientId': 'bench', 'language': 'english'}
+
+    if mode in ('queue', 'sampled'):
+        logsetup.configure_logging('benchmark', sample_rates={'/predict': sample_rate if mode == 'sampled' else 1.0})
+    elif mode == 'sync':
+        logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    logger = logging.getLogger('benchmark')
+
+    counts = [0] * threads
+    latencies = [[] for _ in range(threads)]
+    stop_at = time.perf_counter() + duration
+
+    def handle(index):
+        while True:
+            start = time.perf_counter()
+            if start >= stop_at:
+                break
+            # Stand-in for request work proportional to the payload
+            digest = hashlib.sha1(data['image'].encode('ascii')).hexdigest()
+            if mode == 'print':
+                print("RAW incoming data:", data)
+                print("RAW image_data (first 100 chars):", data['image'][:100], "length:", len(data['image']))
+                print("Received prediction request")
+                print(f"Prediction successful: {digest[:4]}")
+            elif mode == 'sync':
+                logger.info(f"Prediction for client {data['clientId']}: {digest[:4]}")
+            else:
+                logsetup.log_event(logger, '/predict', "Prediction", client_id=data['clientId'],
+                                   prediction=digest[:4], image=data['image'])
+            latencies[index].append(time.perf_counter() - start)
+            counts[index] += 1
+
+    pool = [threading.Thread(target=handle, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    sys.stdout.flush()
+
+    all_latencies = np.concatenate([np.asarray(l) for l in latencies if l]) * 1000
+    result = {'mode': mode, 'requests': sum(counts), 'rps': sum(counts) / duration,
+              'p50_ms': float(np.percentile(all_latencies, 50)), 'p99_ms': float(np.percentile(all_latencies, 99))}
+    if mode in ('queue', 'sampled'):
+        stats = logsetup.logging_stats()
+        result['dropped'] = stats['dropped']
+    sys.stderr.write(json.dumps(result) + '\n')
+
+
+def run_mode(mode, args):
+    """Run one mode in a child process, draining its stdout like a log driver"""
+    command = [sys.executable, os.path.abspath(__file__), '--worker', mode, '--threads', str(args.threads),
+               '--duration', str(args.duration), '--payload-kb', str(args.payload_kb),
+               '--sample-rate', str(args.sample_rate)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    written = [0]
+
+    def drain():
+        while True:
+            chunk = process.stdout.read(65536)
+            if not chunk:
+                break
+            written[0] += len(chunk)
+            if args.drain_delay:
+                time.sleep(args.drain_delay)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    err = process.stderr.read()
+    process.wait()
+    reader.join()
+    lines = [line for line in err.decode('utf-8', 'replace').splitlines() if line.startswith('{')]
+    if not lines:
+        raise RuntimeError(f"{mode} worker failed:\n{err.decode('utf-8', 'replace')}")
+    result = json.loads(lines[-1])
+    result['stdout_mb'] = written[0] / 1e6
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare request throughput across logging setups")
+    parser.add_argument('--modes', nargs='+', default=['print', 'sync', 'queue', 'sampled'],
+                        choices=['print', 'sync', 'queue', 'sampled'])
+    parser.add_argument('--threads', type=int, default=8, help="Simulated request threads")
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument('--payload-kb', type=int, default=40, help="Size of the simulated JPEG before base64")
+    parser.add_argument('--sample-rate', type=float, default=0.01, help="/predict sample rate for 'sampled'")
+    parser.add_argument('--drain-delay', type=float, default=0.0, help="Reader delay per 64 KB of stdout")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.threads, args.duration, args.payload_kb, args.sample_rate)
+        return
+
+    print(f"{args.threads} threads, {args.payload_kb} KB payloads, {args.duration}s per mode, "
+          f"drain delay {args.drain_delay}s/64KB")
+    print(f"{'mode':>8s} {'req/s':>10s} {'p50 ms':>8s} {'p99 ms':>8s} {'stdout MB':>10s} {'dropped':>8s}")
+    for mode in args.modes:
+        r = run_mode(mode, args)
+        print(f"{mode:>8s} {r['rps']:10.0f} {r['p50_ms']:8.3f} {r['p99_ms']:8.3f} "
+              f"{r['stdout_mb']:10.1f} {r.get('dropped', ''):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+benchmark_stride.py - Replay benchmark for stride-based inference scheduling
+
+Replays a recorded keypoint stream and compares inference strides (and the
+adaptive, motion-based stride) against running the action model on every
+frame. For each policy it reports:
+
+    inferences/frame   model runs per incoming frame (inference cost)
+    model ms/frame     inferences/frame x measured single-window latency
+    agreement          frames whose held prediction matches the every-frame
+                       prediction (or the ground-truth labels, if provided)
+    latency            frames (and ms at --fps) from a label change in the
+                       every-frame predictions until the policy reports it
+
+Input is either an .npz file with a ``keypoints`` array of shape (T, 1662)
+(and optionally per-frame ``labels`` as action indices, -1 for none), or a
+video file that is run through MediaPipe Holistic first.
+
+Usage:
+    python benchmark_stride.py session.npz --strides 1 2 3 5 --adaptive
+    python benchmark_stride.py clip.mp4 --save-keypoints clip.npz
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+
+from inference import create_engine, DEFAULT_BACKEND
+from keypoints import KEYPOINT_SIZE, extract_keypoints_into, hand_motion, stride_for_motion
+
+SEQUENCE_LENGTH = 30
+MOTION_THRESHOLD = 0.025
+
+
+def keypoints_from_video(path):
+    import cv2
+    import mediapipe as mp
+
+    rows = []
+    capture = cv2.VideoCapture(path)
+    with mp.solutions.holistic.Holistic(model_complexity=0, static_image_mode=False) as holistic:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            results = holistic.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            rows.append(extract_keypoints_into(results, np.empty(KEYPOINT_SIZE, dtype=np.float32)))
+    capture.release()
+    return np.stack(rows)
+
+
+def motion_series(keypoints):
+    """Per-frame motion exactly as the service computes it (keypoints.hand_motion)"""
+    motion = np.zeros(len(keypoints), dtype=np.float32)
+    for i in range(1, len(keypoints)):
+        motion[i] = hand_motion(keypoints[i], keypoints[i - 1])
+    return motion
+
+
+def every_frame_predictions(engine, keypoints, chunk=64):
+    windows = np.lib.stride_tricks.sliding_window_view(keypoints, (SEQUENCE_LENGTH, KEYPOINT_SIZE))[:, 0]
+    scores = [engine.predict(windows[i:i + chunk]) for i in range(0, len(windows), chunk)]
+    return np.argmax(np.concatenate(scores), axis=1)
+
+
+def single_window_latency(engine, keypoints, runs=50):
+    window = keypoints[np.newaxis, :SEQUENCE_LENGTH]
+    engine.predict(window)
+    start = time.perf_counter()
+    for _ in range(runs):
+        engine.predict(window)
+    return (time.perf_counter() - start) / runs
+
+
+def simulate(reference, motion, stride_fn):
+    """Hold the latest prediction between inference runs, as /predict does"""
+    held = np.empty_like(reference)
+    inferences = 0
+    since = 0
+    current = reference[0]
+    for i in range(len(reference)):
+        since += 1
+        t = i + SEQUENCE_LENGTH - 1
+        if i == 0 or since >= stride_fn(motion[max(0, t - 2):t + 1].mean()):
+            since = 0
+            inferences += 1
+            current = reference[i]
+        held[i] = current
+    return held, inferences
+
+
+def detection_latency(reference, held):
+    """Frames from each change in the reference labels until ``held`` shows it"""
+    latencies = []
+    changes = np.flatnonzero(reference[1:] != reference[:-1]) + 1
+    for start in changes:
+        end = len(reference)
+        later = changes[changes > start]
+        if len(later):
+            end = later[0]
+        seen = np.flatnonzero(held[start:end] == reference[start])
+        if len(seen):
+            latencies.append(seen[0])
+    return latencies, len(changes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay benchmark for inference strides")
+    parser.add_argument('input', help=".npz keypoint recording or a video file")
+    parser.add_argument('--model', default='action.h5')
+    parser.add_argument('--backend', default=os.environ.get('INFERENCE_BACKEND', DEFAULT_BACKEND))
+    parser.add_argument('--strides', type=int, nargs='+', default=[1, 2, 3, 5, 10])
+    parser.add_argument('--adaptive', action='store_true', help="Also evaluate the adaptive stride")
+    parser.add_argument('--max-stride', type=int, default=6)
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--save-keypoints', help="Save keypoints extracted from a video to this .npz")
+    args = parser.parse_args()
+
+    labels = None
+    if args.input.endswith('.npz'):
+        data = np.load(args.input)
+        keypoints = data['keypoints'].astype(np.float32)
+        labels = data['labels'][SEQUENCE_LENGTH - 1:] if 'labels' in data else None
+    else:
+        keypoints = keypoints_from_video(args.input)
+        if args.save_keypoints:
+            np.savez_compressed(args.save_keypoints, keypoints=keypoints)
+    if len(keypoints) < SEQUENCE_LENGTH:
+        raise SystemExit(f"Need at least {SEQUENCE_LENGTH} frames, got {len(keypoints)}")
+
+    import tensorflow as tf
+    engine = create_engine(tf.keras.models.load_model(args.model), args.backend, args.model)
+    reference = every_frame_predictions(engine, keypoints)
+    truth = labels if labels is not None else reference
+    window_ms = single_window_latency(engine, keypoints) * 1000
+    motion = motion_series(keypoints)
+
+    policies = [(f"stride {s}", lambda m, s=s: s) for s in args.strides]
+    if args.adaptive:
+        policies.append((f"adaptive 1-{args.max_stride}",
+                         lambda m: stride_for_motion(m, 1, args.max_stride, MOTION_THRESHOLD * 0.5)))
+
+    print(f"{len(keypoints)} frames, {len(reference)} windows, backend={engine.name}, "
+          f"{window_ms:.2f} ms per window, agreement vs {'labels' if labels is not None else 'every-frame predictions'}")
+    print(f"{'policy':14s} {'inf/frame':>9s} {'model ms/frame':>14s} {'agreement':>9s} "
+          f"{'latency (frames)':>16s} {'latency ms':>10s} {'missed':>6s}")
+    for name, stride_fn in policies:
+        held, inferences = simulate(reference, motion, stride_fn)
+        per_frame = inferences / len(reference)
+        agreement = float(np.mean(held == truth))
+        latencies, changes = detection_latency(reference, held)
+        mean_latency = float(np.mean(latencies)) if latencies else 0.0
+        print(f"{name:14s} {per_frame:9.3f} {per_frame * window_ms:14.2f} {agreement:9.1%} "
+              f"{mean_latency:16.2f} {mean_latency * 1000 / args.fps:10.1f} {changes - len(latencies):6d}")
+
+
+if __name__ == '__main__':
+    main()
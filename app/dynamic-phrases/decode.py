@@ -0,0 +1,109 @@
+"""
+decode.py - Shared image decode stage for the MediaPipe services
+
+Uploads arrive as JPEG (or PNG) bytes at whatever resolution the browser
+captured, but MediaPipe works on normalized landmarks and gains nothing from
+large frames. decode_frame() therefore decodes straight towards a target
+width instead of decoding at full size:
+
+- JPEGs at least 2x, 4x or 8x wider than the target are decoded at 1/2, 1/4
+  or 1/8 scale by the JPEG decoder itself (cv2.IMREAD_REDUCED_COLOR_*),
+  which skips most of the IDCT and colour conversion work,
+- the result is resized (INTER_AREA) to at most ``target_width`` pixels,
+- colour, grayscale and RGBA images all come out as 3-channel uint8 frames
+  (alpha is dropped), and the swap to RGB for MediaPipe is done in place.
+
+Each stage is charged to an optional timer with a ``lap(name)`` method (the
+services' StageTimer): 'decode', 'resize' (only when resizing) and 'convert'.
+"""
+
+import base64
+import binascii
+import struct
+import cv2
+import numpy as np
+
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                  (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def decode_base64(image_data):
+    """Bytes from a base64 string or ``data:image/...;base64,`` URL"""
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    try:
+        return base64.b64decode(image_data)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid base64 image data: {e}")
+
+
+def jpeg_dimensions(data):
+    """(width, height) from a JPEG's frame header, or None if ``data`` is not a JPEG"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1  # fill byte
+            continue
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack_from('>HH', data, i + 5)
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2  # markers without a length field
+            continue
+        i += 2 + struct.unpack_from('>H', data, i + 2)[0]
+    return None
+
+
+def reduced_decode_flag(width, target_width):
+    """The IMREAD flag that decodes a ``width`` wide JPEG closest to (not below) ``target_width``"""
+    if target_width > 0:
+        for factor, flag in _REDUCED_FLAGS:
+            if width // factor >= target_width:
+                return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_frame(data, target_width=0, rgb=True, timer=None):
+    """Decode image bytes to a 3-channel uint8 frame at most ``target_width`` wide.
+
+    ``target_width=0`` keeps the full resolution. Frames are RGB (for
+    MediaPipe) unless ``rgb`` is false, in which case they stay BGR as
+    OpenCV decodes them. Raises ValueError if the bytes are not an image.
+    """
+    if not data:
+        raise ValueError("Empty image data")
+    buffer = np.frombuffer(data, np.uint8)
+    flag = cv2.IMREAD_COLOR
+    dimensions = jpeg_dimensions(data)
+    if dimensions is not None:
+        flag = reduced_decode_flag(dimensions[0], target_width)
+    # IMREAD_COLOR (and its reduced variants) expands grayscale and drops alpha
+    try:
+        frame = cv2.imdecode(buffer, flag)
+    except cv2.error as e:
+        raise ValueError(f"Invalid image: {e}")
+    if frame is None:
+        raise ValueError("Invalid image")
+    if timer is not None:
+        timer.lap('decode')
+
+    height, width = frame.shape[:2]
+    if target_width > 0 and width > target_width:
+        target_height = max(1, int(round(height * target_width / width)))
+        frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_AREA)
+        if timer is not None:
+            timer.lap('resize')
+
+    if rgb:
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+        if timer is not None:
+            timer.lap('convert')
+    return frame
@@ -0,0 +1,223 @@
+"""
+keypoints.py - Fast keypoint extraction from MediaPipe Holistic results
+
+Writes pose, face and hand landmarks straight into a preallocated float32 row
+(e.g. a row of a client's frame buffer) without building intermediate Python
+lists. The row layout matches the one action.h5 was trained on:
+
+    pose        33 x (x, y, z, visibility)    [0, 132)
+    face       468 x (x, y, z)                [132, 1536)
+    left hand   21 x (x, y, z)                [1536, 1599)
+    right hand  21 x (x, y, z)                [1599, 1662)
+
+FrameRingBuffer holds a client's last N rows in a fixed float32 array so new
+frames are written in place and inference windows need at most one copy.
+hand_motion and MotionHistory compute per-frame hand motion from those rows.
+"""
+
+import os
+import operator
+from itertools import chain, islice
+import numpy as np
+
+POSE_SIZE = 33 * 4
+FACE_SIZE = 468 * 3
+HAND_SIZE = 21 * 3
+KEYPOINT_SIZE = POSE_SIZE + FACE_SIZE + 2 * HAND_SIZE
+
+POSE_OFFSET = 0
+FACE_OFFSET = POSE_OFFSET + POSE_SIZE
+LEFT_HAND_OFFSET = FACE_OFFSET + FACE_SIZE
+RIGHT_HAND_OFFSET = LEFT_HAND_OFFSET + HAND_SIZE
+
+# Face landmark stride: 1 = all 468 landmarks, N = every Nth landmark, 0 = skip
+# the face block. Skipped landmarks are left at zero, so only lower this for
+# models that do not rely on face features.
+FACE_KEYPOINT_STRIDE = int(os.environ.get('FACE_KEYPOINT_STRIDE', '1'))
+
+_xyz = operator.attrgetter('x', 'y', 'z')
+_xyzv = operator.attrgetter('x', 'y', 'z', 'visibility')
+
+
+def _write_block(block, landmark_list, getter, width, stride=1):
+    """Copy a landmark list into ``block`` (a view of the output row)"""
+    if landmark_list is None or stride <= 0:
+        block.fill(0.0)
+        return
+    landmarks = landmark_list.landmark
+    if stride == 1:
+        # fromiter as float64 (native Python floats); the assignment casts to float32
+        block[:] = np.fromiter(chain.from_iterable(map(getter, landmarks)),
+                               dtype=np.float64, count=block.size)
+        return
+    block.fill(0.0)
+    rows = block.reshape(-1, width)[::stride]
+    picked = islice(landmarks, 0, rows.shape[0] * stride, stride)
+    rows[:] = np.fromiter(chain.from_iterable(map(getter, picked)),
+                          dtype=np.float64, count=rows.size).reshape(rows.shape)
+
+
+def extract_keypoints_into(results, out, face_stride=None):
+    """Write the keypoints of one Holistic result into ``out`` (float32, KEYPOINT_SIZE)"""
+    face_stride = FACE_KEYPOINT_STRIDE if face_stride is None else face_stride
+    _write_block(out[POSE_OFFSET:FACE_OFFSET], results.pose_landmarks, _xyzv, 4)
+    _write_block(out[FACE_OFFSET:LEFT_HAND_OFFSET], results.face_landmarks, _xyz, 3, face_stride)
+    _write_block(out[LEFT_HAND_OFFSET:RIGHT_HAND_OFFSET], results.left_hand_landmarks, _xyz, 3)
+    _write_block(out[RIGHT_HAND_OFFSET:KEYPOINT_SIZE], results.right_hand_landmarks, _xyz, 3)
+    return out
+
+
+def extract_keypoints_reference(results):
+    """Original list-based extraction, kept as the reference for benchmarks and checks"""
+    pose = np.array([[res.x, res.y, res.z, res.visibility] for res in results.pose_landmarks.landmark]).flatten() if results.pose_landmarks else np.zeros(33*4)
+    face = np.array([[res.x, res.y, res.z] for res in results.face_landmarks.landmark]).flatten() if results.face_landmarks else np.zeros(468*3)
+    lh = np.array([[res.x, res.y, res.z] for res in results.left_hand_landmarks.landmark]).flatten() if results.left_hand_landmarks else np.zeros(21*3)
+    rh = np.array([[res.x, res.y, res.z] for res in results.right_hand_landmarks.landmark]).flatten() if results.right_hand_landmarks else np.zeros(21*3)
+    return np.concatenate([pose, face, lh, rh])
+
+
+class FrameRingBuffer:
+    """Fixed-size float32 ring buffer of keypoint rows for one client.
+
+    Every row is stored twice (at ``i`` and ``i + length``), so the last
+    ``length`` frames in chronological order are always one contiguous slice
+    of the backing array. ``view()`` returns that slice without copying and
+    ``snapshot()`` returns a model-ready (1, n, width) copy in a single copy.
+
+    Typical use, writing keypoints straight into the buffer:
+
+        row = frames.next_row()
+        extract_keypoints_into(results, row)
+        frames.commit()
+
+    ``next_row`` is a separate scratch row, so an extraction that fails
+    halfway never touches the window; ``commit`` copies it into the slot of
+    the oldest frame.
+    """
+
+    def __init__(self, length=30, width=KEYPOINT_SIZE):
+        self.length = length
+        self.width = width
+        self._data = np.zeros((2 * length, width), dtype=np.float32)
+        self._scratch = np.zeros(width, dtype=np.float32)
+        self._index = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes + self._scratch.nbytes
+
+    def next_row(self):
+        """Scratch row that the next frame should be written into (not part of the window)"""
+        return self._scratch
+
+    def commit(self):
+        """Add the row returned by ``next_row`` to the window, replacing the oldest frame once full"""
+        self._data[self._index] = self._scratch
+        self._data[self._index + self.length] = self._scratch
+        self._index = (self._index + 1) % self.length
+        self._count = min(self._count + 1, self.length)
+
+    def append(self, keypoints):
+        self.next_row()[:] = keypoints
+        self.commit()
+
+    def clear(self):
+        self._index = 0
+        self._count = 0
+
+    def latest(self, offset=0):
+        """Most recent frame (``offset`` = 1 for the one before), or None"""
+        if offset >= self._count:
+            return None
+        return self._data[(self._index - 1 - offset) % self.length]
+
+    def view(self):
+        """Chronological (n, width) view of the window; valid until the next write"""
+        start = (self._index - self._count) % self.length
+        return self._data[start:start + self._count]
+
+    def snapshot(self):
+        """Chronological (1, n, width) copy of the window, ready for model input"""
+        return self.view()[np.newaxis].copy()
+
+
+def hand_motion(current, previous):
+    """Hand motion between two keypoint rows.
+
+    The mean landmark displacement of each hand present in both rows, maxed
+    over the two hands (0.0 if neither hand is in both). An absent hand is
+    an all-zero block, as written by extract_keypoints_into.
+    """
+    if previous is None:
+        return 0.0
+    current_hands = current[LEFT_HAND_OFFSET:KEYPOINT_SIZE].reshape(2, 21, 3)
+    previous_hands = previous[LEFT_HAND_OFFSET:KEYPOINT_SIZE].reshape(2, 21, 3)
+    present = current_hands.any(axis=(1, 2)) & previous_hands.any(axis=(1, 2))
+    if not present.any():
+        return 0.0
+    step = np.linalg.norm(current_hands - previous_hands, axis=2).mean(axis=1)
+    return float(step[present].max())
+
+
+class MotionHistory:
+    """Last ``length`` per-frame motion values in a fixed float64 array.
+
+    Stored twice like FrameRingBuffer, so the most recent values are always
+    one contiguous slice and ``mean(n)`` is a single reduction returning a
+    Python float.
+    """
+
+    def __init__(self, length=10):
+        self.length = length
+        self._data = np.zeros(2 * length, dtype=np.float64)
+        self._index = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def append(self, value):
+        self._data[self._index] = self._data[self._index + self.length] = value
+        self._index = (self._index + 1) % self.length
+        self._count = min(self._count + 1, self.length)
+
+    def latest(self):
+        """Most recent value, or 0.0 if there is none"""
+        if not self._count:
+            return 0.0
+        return float(self._data[(self._index - 1) % self.length])
+
+    def mean(self, n):
+        """Mean of the last ``n`` values (fewer if not that many yet)"""
+        n = min(n, self._count)
+        if not n:
+            return 0.0
+        end = self._index + self.length
+        return float(self._data[end - n:end].sum()) / n
+
+    def copy(self):
+        """Independent copy, e.g. to hand to a queued prediction"""
+        other = MotionHistory.__new__(MotionHistory)
+        other.length, other._index, other._count = self.length, self._index, self._count
+        other._data = self._data.copy()
+        return other
+
+
+def stride_for_motion(recent_motion, base_stride, max_stride, low_motion):
+    """Frames between inference runs given a client's recent hand motion.
+
+    At or above ``low_motion`` the base stride is used; below it the stride
+    grows linearly towards ``max_stride`` as motion approaches zero.
+    """
+    if max_stride <= base_stride or recent_motion >= low_motion:
+        return base_stride
+    ratio = max(recent_motion, 0.0) / low_motion
+    return int(round(max_stride - (max_stride - base_stride) * ratio))
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+"""
+load_test.py - Multi-client HTTP load test for the /predict endpoints
+
+Simulates N concurrent browser clients against a service, each with its own
+clientId, for a fixed time per concurrency level, and reports per level:
+
+    throughput   replies/s, against the frame rate offered by the clients
+    latency      p50/p95/p99 from a frame's capture time to its reply
+    errors       failed requests (HTTP errors, timeouts) as a share of sent
+    staleness    per client, how old the prediction on screen is: at every
+                 frame tick, the time since the newest frame with a reply
+                 was captured (p95 of the median client and worst client)
+
+Two load models:
+
+    closed loop  (default) each client posts the next frame as soon as the
+                 previous reply arrives; measures peak throughput
+    open loop    (--fps) each client captures frames at its own rate like a
+                 webcam, whether or not the server keeps up. A client has at
+                 most --max-in-flight requests outstanding; frames captured
+                 while it is full are skipped, as the UI does. Latency is
+                 measured from the capture tick, so queueing is not hidden.
+
+A level is marked saturated once replies fall below 95% of the offered
+frame rate, or more than 1% of requests fail, so ramping --clients shows
+where a configuration stops keeping up.
+
+Frames come from --frames: a recording from POST /record (.npz, replayed in
+order), a directory of images (searched recursively, PNGs re-encoded to
+JPEG as a browser canvas would) or one image. The default is the sign
+images under app/ui/public/images, else synthetic noise.
+
+    python app.py                                     # dev server
+    python load_test.py http://localhost:5008 --label dev
+    python load_test.py http://localhost:5008 --fps 15 30 --clients 1 2 4 8 16 32 --label dev
+
+    WEB_WORKERS=4 gunicorn -c gunicorn.conf.py        # static-signs service
+    python load_test.py http://localhost:8000 --kind static --fps 5 --label gunicorn-4
+
+Add --csv results.csv to append rows for several runs to one file.
+"""
+
+import argparse
+import base64
+import csv
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+DEFAULT_FRAMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ui', 'public', 'images')
+
+CSV_FIELDS = ['label', 'mode', 'clients', 'offered_fps', 'sent', 'requests', 'errors', 'error_rate', 'skipped',
+              'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'stale_p95_ms', 'stale_worst_ms', 'saturated']
+
+
+def make_payload(kind, image, client_id):
+    """Request body for one base64-encoded JPEG"""
+    if kind == 'static':
+        return {'image': image, 'annotate': 'none'}
+    return {'image': f'data:image/jpeg;base64,{image}', 'clientId': client_id, 'language': 'english'}
+
+
+def synthetic_jpeg(width=640, height=480):
+    import cv2
+    rng = np.random.default_rng(0)
+    frame = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    return cv2.imencode('.jpg', frame)[1].tobytes()
+
+
+def as_jpeg(data):
+    """JPEG bytes as-is; other image formats re-encoded at quality 92 (canvas.toDataURL's default)"""
+    if data[:2] == b'\xff\xd8':
+        return data
+    import cv2
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 92])[1].tobytes()
+
+
+def load_frames(path):
+    """JPEG frames from a recording, a directory of images or one image file"""
+    if path.endswith('.npz'):
+        from recording import load_recording
+        return load_recording(path)[0]
+    if os.path.isdir(path):
+        names = sorted(name for pattern in ('*.jpg', '*.jpeg', '*.png')
+                       for name in glob.glob(os.path.join(path, '**', pattern), recursive=True))
+    else:
+        names = [path]
+    frames = []
+    for name in names:
+        with open(name, 'rb') as f:
+            frame = as_jpeg(f.read())
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+class ClientStats:
+    """Replies, errors and prediction staleness of one simulated client"""
+
+    def __init__(self):
+        self.latencies = []
+        self.staleness = []
+        self.errors = 0
+        self.skipped = 0
+        self.sent = 0
+        self.freshest = None  # capture time of the newest frame with a reply
+        self.lock = threading.Lock()
+
+    def tick(self, now, measured):
+        """Called at every frame capture: sample the age of the prediction shown"""
+        with self.lock:
+            if measured and self.freshest is not None:
+                self.staleness.append(now - self.freshest)
+
+    def reply(self, captured, ok, measured):
+        done = time.perf_counter()
+        with self.lock:
+            if ok and (self.freshest is None or captured > self.freshest):
+                self.freshest = captured
+            if not measured:
+                return
+            self.sent += 1
+            if ok:
+                self.latencies.append(done - captured)
+            else:
+                self.errors += 1
+
+
+def post(http, url, payload):
+    try:
+        return http.post(url, json=payload, timeout=30).ok
+    except requests.RequestException:
+        return False
+
+
+def run_closed_client(url, kind, frames, client_id, offset, stats, start_at, stop_at):
+    http = requests.Session()
+    index = offset
+    while True:
+        captured = time.perf_counter()
+        if captured >= stop_at:
+            break
+        measured = captured >= start_at
+        stats.tick(captured, measured)
+        ok = post(http, url, make_payload(kind, frames[index % len(frames)], client_id))
+        stats.reply(captured, ok, measured)
+        index += 1
+
+
+def run_open_client(url, kind, frames, client_id, offset, fps, max_in_flight, executor, stats, start_at, stop_at):
+    local = threading.local()
+    in_flight = threading.Semaphore(max_in_flight)
+
+    def send(payload, captured, measured):
+        if not hasattr(local, 'http'):
+            local.http = requests.Session()
+        try:
+            stats.reply(captured, post(local.http, url, payload), measured)
+        finally:
+            in_flight.release()
+
+    interval = 1.0 / fps
+    # Spread the clients' capture ticks over one frame interval
+    tick_at = time.perf_counter() + interval * (offset % 97) / 97
+    index = offset
+    while tick_at < stop_at:
+        delay = tick_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        measured = tick_at >= start_at
+        stats.tick(tick_at, measured)
+        if in_flight.acquire(blocking=False):
+            payload = make_payload(kind, frames[index % len(frames)], client_id)
+            executor.submit(send, payload, tick_at, measured)
+        elif measured:
+            with stats.lock:
+                stats.skipped += 1
+        index += 1
+        tick_at += interval
+
+
+def client_rates(clients, fps, seed=0):
+    """Frame rate per client: one value, or uniform over [low, high]"""
+    if not fps:
+        return [None] * clients
+    if len(fps) == 1:
+        return [fps[0]] * clients
+    return list(np.random.default_rng(seed + clients).uniform(fps[0], fps[1], clients))
+
+
+def run_level(url, kind, frames, clients, duration, warmup, fps=None, max_in_flight=1):
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+    rates = client_rates(clients, fps)
+    stats = [ClientStats() for _ in range(clients)]
+    # Recordings are streams: start clients at different points of it
+    offsets = [i * max(1, len(frames) // clients) for i in range(clients)]
+    executor = ThreadPoolExecutor(max_workers=clients * max_in_flight) if fps else None
+
+    threads = []
+    for i in range(clients):
+        client_id = f'load-test-{clients}-{i}'
+        if fps:
+            target, args = run_open_client, (url, kind, frames, client_id, offsets[i], rates[i], max_in_flight,
+                                             executor, stats[i], start_at, stop_at)
+        else:
+            target, args = run_closed_client, (url, kind, frames, client_id, offsets[i], stats[i], start_at, stop_at)
+        threads.append(threading.Thread(target=target, args=args, daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+    latencies_ms = np.concatenate([np.asarray(s.latencies) for s in stats]) * 1000
+    sent = sum(s.sent for s in stats)
+    errors = sum(s.errors for s in stats)
+    result = {'mode': 'open' if fps else 'closed', 'clients': clients, 'sent': sent, 'requests': len(latencies_ms),
+              'errors': errors, 'error_rate': errors / sent if sent else 0.0,
+              'skipped': sum(s.skipped for s in stats), 'rps': len(latencies_ms) / duration,
+              'offered_fps': float(sum(rates)) if fps else 0.0}
+    if len(latencies_ms):
+        result['p50_ms'], result['p95_ms'], result['p99_ms'] = np.percentile(latencies_ms, [50, 95, 99])
+    else:
+        result['p50_ms'] = result['p95_ms'] = result['p99_ms'] = 0.0
+
+    # A client that never got a reply has been looking at nothing for the whole level
+    stale_p95 = [np.percentile(s.staleness, 95) * 1000 if s.staleness else (duration + warmup) * 1000
+                 for s in stats]
+    result['stale_p95_ms'] = float(np.median(stale_p95))
+    result['stale_worst_ms'] = float(max(stale_p95))
+    if fps:
+        result['saturated'] = result['rps'] < 0.95 * result['offered_fps'] or result['error_rate'] > 0.01
+    else:
+        result['saturated'] = result['error_rate'] > 0.01
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a /predict endpoint with simulated clients")
+    parser.add_argument('base_url', help="Service base URL, e.g. http://localhost:5008")
+    parser.add_argument('--kind', choices=['dynamic', 'static'], default='dynamic',
+                        help="Request format: dynamic (data URL + clientId) or static (plain base64)")
+    parser.add_argument('--frames', help="Recording (.npz), image directory or image to send "
+                                         "(default: app/ui/public/images, else synthetic noise)")
+    parser.add_argument('--image', help=argparse.SUPPRESS)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--fps', type=float, nargs='+',
+                        help="Open loop: frames/s per client, or LOW HIGH for a rate per client drawn from the range")
+    parser.add_argument('--max-in-flight', type=int, default=1, help="Open loop: outstanding requests per client")
+    parser.add_argument('--duration', type=float, default=20.0, help="Measured seconds per level")
+    parser.add_argument('--warmup', type=float, default=3.0, help="Unmeasured seconds before each level")
+    parser.add_argument('--label', default='', help="Name of the server configuration under test")
+    parser.add_argument('--csv', help="Append results to this CSV file")
+    args = parser.parse_args()
+
+    url = args.base_url.rstrip('/') + '/predict'
+    source = args.frames or args.image
+    if source:
+        frames = load_frames(source)
+    elif os.path.isdir(DEFAULT_FRAMES):
+        source = os.path.normpath(DEFAULT_FRAMES)
+        frames = load_frames(source)
+    else:
+        source, frames = 'synthetic', [synthetic_jpeg()]
+    if not frames:
+        raise SystemExit(f"No frames in {source}")
+    frames = [base64.b64encode(frame).decode('utf-8') for frame in frames]
+
+    mode = f"open loop at {'-'.join(f'{fps:g}' for fps in args.fps)} fps per client" if args.fps else "closed loop"
+    print(f"{url} ({args.kind}) {args.label}: {mode}, {len(frames)} frames from {source}, "
+          f"{os.cpu_count()} client cores")
+    print(f"{'clients':>7s} {'offered':>8s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'errors':>7s} {'skipped':>7s} {'stale p95':>9s} {'worst':>7s}")
+    rows = []
+    saturation = None
+    for clients in args.clients:
+        result = run_level(url, args.kind, frames, clients, args.duration, args.warmup,
+                           args.fps, max(1, args.max_in_flight))
+        result['label'] = args.label
+        rows.append(result)
+        if result['saturated'] and saturation is None:
+            saturation = clients
+        offered = f"{result['offered_fps']:8.1f}" if args.fps else f"{'-':>8s}"
+        print(f"{clients:7d} {offered} {result['rps']:8.1f} {result['p50_ms']:8.1f} {result['p95_ms']:8.1f} "
+              f"{result['p99_ms']:8.1f} {result['error_rate']:6.1%} {result['skipped']:7d} "
+              f"{result['stale_p95_ms']:9.0f} {result['stale_worst_ms']:7.0f}"
+              f"{'  saturated' if result['saturated'] else ''}")
+    if saturation is not None:
+        print(f"Saturated at {saturation} clients")
+
+    if args.csv:
+        new_file = not os.path.exists(args.csv)
+        with open(args.csv, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+recording.py - Record a client's frame stream for offline replay
+
+SessionRecorder keeps the encoded frames a client sends to /predict or /ws
+exactly as received (JPEG bytes, no re-encoding), with their arrival times,
+and writes them to one .npz file when the recording stops:
+
+    jpeg        uint8, all frames concatenated
+    offsets     int64 (N + 1,), frame i is jpeg[offsets[i]:offsets[i + 1]]
+    timestamps  float64 (N,), seconds since the first frame
+    meta        JSON string (clientId, language, source route, start time)
+
+A 30 fps webcam stream at 640x480 costs roughly 1-2 MB per second of video.
+load_recording() reads the file back for replay_session.py.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+
+
+def save_recording(path, frames, timestamps, meta):
+    offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(frame) for frame in frames])
+    data = np.frombuffer(b''.join(frames), dtype=np.uint8)
+    times = np.asarray(timestamps, dtype=np.float64)
+    if len(times):
+        times = times - times[0]
+    np.savez(path, jpeg=data, offsets=offsets, timestamps=times, meta=np.array(json.dumps(meta)))
+
+
+def load_recording(path):
+    """(frames as a list of bytes, timestamps in seconds, meta dict)"""
+    with np.load(path, allow_pickle=False) as recording:
+        data = recording['jpeg']
+        offsets = recording['offsets']
+        frames = [data[offsets[i]:offsets[i + 1]].tobytes() for i in range(len(offsets) - 1)]
+        return frames, recording['timestamps'].astype(np.float64), json.loads(str(recording['meta']))
+
+
+class SessionRecorder:
+    """Per-client frame recordings held in memory until stop() writes them out.
+
+    ``add`` is called for every frame, so it is a dictionary lookup when the
+    client is not being recorded. A recording stops taking frames once it
+    holds ``max_frames``.
+    """
+
+    def __init__(self, directory, max_frames):
+        self.directory = directory
+        self.max_frames = max(1, max_frames)
+        self._recordings = {}
+        self._lock = threading.Lock()
+
+    def start(self, client_id, **meta):
+        with self._lock:
+            if client_id in self._recordings:
+                return False
+            self._recordings[client_id] = {
+                'frames': [], 'timestamps': [], 'truncated': False,
+                'meta': dict(meta, clientId=client_id, started_at=time.time())
+            }
+            return True
+
+    def add(self, client_id, data, **meta):
+        recording = self._recordings.get(client_id)
+        if recording is None:
+            return
+        with self._lock:
+            if len(recording['frames']) >= self.max_frames:
+                recording['truncated'] = True
+                return
+            recording['frames'].append(bytes(data))
+            recording['timestamps'].append(time.time())
+            for key, value in meta.items():
+                recording['meta'].setdefault(key, value)
+
+    def stop(self, client_id):
+        """Write the client's recording to disk; returns (path, frame count) or None"""
+        with self._lock:
+            recording = self._recordings.pop(client_id, None)
+        if recording is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', str(client_id))[:64]
+        path = os.path.join(self.directory, f"{safe_id}-{time.strftime('%Y%m%d-%H%M%S')}.npz")
+        meta = dict(recording['meta'], frames=len(recording['frames']), truncated=recording['truncated'])
+        save_recording(path, recording['frames'], recording['timestamps'], meta)
+        return path, len(recording['frames'])
+
+    def stats(self):
+        with self._lock:
+            return {str(client_id): len(recording['frames']) for client_id, recording in self._recordings.items()}
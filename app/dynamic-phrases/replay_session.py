@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""
+replay_session.py - Replay a recorded frame stream through the full pipeline
+
+Loads app.py in-process (action model, warmup, Holistic pool, prediction
+workers) and feeds a recording through the same path as /predict:
+decode_frame, holistic.process, keypoint extraction, the prediction worker
+pool and the sentence logic. No webcam, browser or HTTP involved, so runs are
+reproducible. Reports:
+
+    per-frame latency   p50/p95/p99 of decode + process_frame, per stage
+    time to append      for each sign added to the sentence, stream time from
+                        the first frame the model predicted it (since the
+                        previous append) until it was appended
+    throughput          frames/s of wall time and per core (CPU seconds of
+                        the whole process, all threads)
+
+--speed realtime paces frames by their recorded timestamps, so the sentence
+logic (which uses wall-clock time) sees the original timing. --speed max
+feeds frames as fast as possible to measure throughput; windows then
+coalesce in the prediction queue as they would on an overloaded server.
+
+Input is a recording made with POST /record (see recording.py), a video
+file, or a directory of JPEG/PNG frames (the last two at --fps).
+
+Usage:
+    python replay_session.py recordings/client-20250101-120000.npz
+    python replay_session.py clip.mp4 --speed max --repeat 3 --json result.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
+
+from recording import load_recording
+
+
+def frames_from_video(path, fps):
+    import cv2
+    capture = cv2.VideoCapture(path)
+    source_fps = capture.get(cv2.CAP_PROP_FPS) or fps
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes())
+    capture.release()
+    return frames, np.arange(len(frames)) / source_fps, {'source': path}
+
+
+def frames_from_directory(path, fps):
+    names = sorted(name for pattern in ('*.jpg', '*.jpeg', '*.png')
+                   for name in glob.glob(os.path.join(path, pattern)))
+    frames = []
+    for name in names:
+        with open(name, 'rb') as f:
+            frames.append(f.read())
+    return frames, np.arange(len(frames)) / fps, {'source': path}
+
+
+def load_input(path, fps):
+    if os.path.isdir(path):
+        return frames_from_directory(path, fps)
+    if path.endswith('.npz'):
+        return load_recording(path)
+    return frames_from_video(path, fps)
+
+
+def wait_for_predictions(service, timeout=5.0):
+    """Block until the prediction workers have applied every queued window"""
+    deadline = time.perf_counter() + timeout
+    while service.prediction_scheduler.stats()['clients_pending'] and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+def replay(service, frames, timestamps, client_id, speed, wait):
+    session = service.sequence_buffer.get_or_create(client_id)
+    latencies = []
+    stage_totals = {}
+    appends = []
+    previous_sentence = []
+    run_action, run_start = None, 0.0
+
+    start_wall = time.perf_counter()
+    for index, data in enumerate(frames):
+        if speed == 'realtime':
+            delay = timestamps[index] - (time.perf_counter() - start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        stream_time = time.perf_counter() - start_wall
+
+        timer = service.StageTimer('/replay')
+        try:
+            frame = service.decode_frame(data, service.DECODE_TARGET_WIDTH, timer=timer)
+        except ValueError:
+            continue
+        service.process_frame(client_id, session, frame, timer)
+        latencies.append(timer.total())
+        for name, seconds in timer.stages.items():
+            stage_totals[name] = stage_totals.get(name, 0.0) + seconds
+        if wait:
+            wait_for_predictions(service)
+
+        # Time from the model first predicting a sign to the sign being appended
+        predicted = session['last_prediction'][4]
+        if predicted != run_action:
+            run_action, run_start = predicted, stream_time
+        sentence = list(session['sentence'])
+        if sentence != previous_sentence and sentence:
+            sign = sentence[-1]
+            appends.append({
+                'sign': sign,
+                'frame': index,
+                'stream_s': round(stream_time, 3),
+                'time_to_append_ms': round((stream_time - run_start) * 1000, 1) if run_action == sign else None
+            })
+            previous_sentence = sentence
+    wall = time.perf_counter() - start_wall
+    return latencies, stage_totals, appends, list(session['sentence']), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded frame stream through the dynamic-phrases pipeline")
+    parser.add_argument('input', help="Recording (.npz from POST /record), video file or directory of frames")
+    parser.add_argument('--speed', choices=['realtime', 'max'], default='realtime')
+    parser.add_argument('--fps', type=float, default=30.0, help="Frame rate for frame directories")
+    parser.add_argument('--repeat', type=int, default=1, help="Replay the stream this many times (fresh session each)")
+    parser.add_argument('--wait-predictions', action='store_true',
+                        help="Wait for each queued prediction before the next frame (deterministic, slower)")
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args()
+
+    frames, timestamps, meta = load_input(args.input, args.fps)
+    if not frames:
+        raise SystemExit(f"No frames in {args.input}")
+
+    # app.py loads action.h5 relative to the working directory
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+    import app as service
+    while not service.startup.ready:
+        if service.startup.error:
+            raise SystemExit(f"Service failed to start: {service.startup.error}")
+        time.sleep(0.05)
+
+    duration = float(timestamps[-1]) if len(timestamps) else 0.0
+    print(f"{len(frames)} frames ({duration:.1f}s recorded, {meta.get('source', meta.get('clientId', ''))}), "
+          f"speed {args.speed}, mode {service.INFERENCE_MODE}, backend {service.engine.name}")
+
+    runs = []
+    cpu_start = time.process_time()
+    for run in range(args.repeat):
+        client_id = f'replay-{run}'
+        latencies, stage_totals, appends, sentence, wall = replay(
+            service, frames, timestamps, client_id, args.speed, args.wait_predictions)
+        service.sequence_buffer.discard(client_id)
+        runs.append((latencies, stage_totals, appends, sentence, wall))
+    cpu = time.process_time() - cpu_start
+
+    all_latencies = np.concatenate([np.asarray(run[0]) for run in runs]) * 1000
+    total_frames = len(all_latencies)
+    total_wall = sum(run[4] for run in runs)
+    stage_ms = {}
+    for run in runs:
+        for name, seconds in run[1].items():
+            stage_ms[name] = stage_ms.get(name, 0.0) + seconds
+    stage_ms = {name: round(seconds * 1000 / total_frames, 3) for name, seconds in stage_ms.items()}
+    p50, p95, p99 = np.percentile(all_latencies, [50, 95, 99])
+
+    print(f"\nPer-frame latency (decode + process_frame): p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+    print("Average per stage (ms): " + ', '.join(f'{name} {ms:.2f}' for name, ms in stage_ms.items()))
+    print(f"Throughput: {total_frames / total_wall:.1f} frames/s wall, "
+          f"{total_frames / cpu:.1f} frames/s per core ({cpu:.1f} CPU s on {os.cpu_count()} cores)")
+    for run, (_, _, appends, sentence, _) in enumerate(runs):
+        print(f"\nRun {run + 1}: sentence {sentence}")
+        for append in appends:
+            latency = append['time_to_append_ms']
+            print(f"  {append['sign']:>10s} at frame {append['frame']:5d} ({append['stream_s']:6.2f}s), "
+                  f"time to append {latency if latency is not None else '-'} ms")
+    predictions = service.prediction_scheduler.stats()
+    print(f"\nPrediction windows: {predictions['processed']} run, {predictions['coalesced']} coalesced, "
+          f"{predictions['dropped']} dropped")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'input': args.input, 'speed': args.speed, 'frames': total_frames,
+                'latency_ms': {'p50': p50, 'p95': p95, 'p99': p99}, 'stage_ms': stage_ms,
+                'fps_wall': total_frames / total_wall, 'fps_per_core': total_frames / cpu,
+                'runs': [{'sentence': run[3], 'appends': run[2]} for run in runs],
+                'predictions': {key: predictions[key] for key in ('processed', 'coalesced', 'dropped')}
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
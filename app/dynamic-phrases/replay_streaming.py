@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+replay_streaming.py - Check streaming (stateful) inference against windowed inference
+
+Replays a recorded keypoint stream through the StreamingEngine one frame at a
+time and compares its predictions with running the action model over the
+sliding 30-frame window on every frame (the windowed reference). Reports, per
+number of staggered streams, argmax agreement, score differences and the
+per-frame cost of each mode.
+
+Input is an .npz file with a ``keypoints`` array of shape (T, 1662) or a
+video file (see benchmark_stride.py).
+
+Usage:
+    python replay_streaming.py session.npz --streams 1 2 3 --min-agreement 0.9
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+from inference import create_engine, DEFAULT_BACKEND, StreamingEngine
+from benchmark_stride import SEQUENCE_LENGTH, keypoints_from_video
+
+
+def windowed_scores(engine, keypoints, chunk=64):
+    windows = np.lib.stride_tricks.sliding_window_view(keypoints, (SEQUENCE_LENGTH, keypoints.shape[1]))[:, 0]
+    return np.concatenate([engine.predict(windows[i:i + chunk]) for i in range(0, len(windows), chunk)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming and windowed action model inference")
+    parser.add_argument('input', help=".npz keypoint recording or a video file")
+    parser.add_argument('--model', default='action.h5')
+    parser.add_argument('--backend', default=os.environ.get('INFERENCE_BACKEND', DEFAULT_BACKEND),
+                        help="Backend for the windowed reference")
+    parser.add_argument('--streams', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--min-agreement', type=float, default=0.9,
+                        help="Exit non-zero if any configuration agrees on fewer frames than this")
+    args = parser.parse_args()
+
+    if args.input.endswith('.npz'):
+        keypoints = np.load(args.input)['keypoints'].astype(np.float32)
+    else:
+        keypoints = keypoints_from_video(args.input)
+    if len(keypoints) < SEQUENCE_LENGTH:
+        raise SystemExit(f"Need at least {SEQUENCE_LENGTH} frames, got {len(keypoints)}")
+
+    import tensorflow as tf
+    model = tf.keras.models.load_model(args.model)
+    engine = create_engine(model, args.backend, args.model)
+
+    start = time.perf_counter()
+    reference = windowed_scores(engine, keypoints)
+    windowed_ms = (time.perf_counter() - start) * 1000 / len(reference)
+    reference_labels = np.argmax(reference, axis=1)
+
+    print(f"{len(keypoints)} frames, windowed reference ({engine.name}): {windowed_ms:.2f} ms/frame")
+    print(f"{'streams':>7s} {'agreement':>9s} {'mean |diff|':>11s} {'max |diff|':>10s} {'ms/frame':>8s} {'speedup':>7s}")
+    failed = False
+    for streams in args.streams:
+        state = StreamingEngine(model, SEQUENCE_LENGTH, streams).new_state()
+        outputs = []
+        start = time.perf_counter()
+        for t, row in enumerate(keypoints):
+            scores = state.step(row)
+            if t >= SEQUENCE_LENGTH - 1:
+                outputs.append(scores)
+        streaming_ms = (time.perf_counter() - start) * 1000 / len(keypoints)
+        outputs = np.stack(outputs)
+
+        diff = np.abs(outputs - reference)
+        agreement = float(np.mean(np.argmax(outputs, axis=1) == reference_labels))
+        failed = failed or agreement < args.min_agreement
+        print(f"{streams:7d} {agreement:9.1%} {diff.mean():11.4f} {diff.max():10.4f} "
+              f"{streaming_ms:8.2f} {windowed_ms / streaming_ms:6.1f}x")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+router.conf.py - gunicorn settings for the sticky front router (router.py)
+
+    ROUTER_PROCESSES=4 gunicorn -c router.conf.py
+
+Unless ROUTER_BACKENDS lists existing backends, the gunicorn master starts
+ROUTER_PROCESSES single-worker backends (gunicorn -c gunicorn.conf.py) on
+127.0.0.1 ports ROUTER_BACKEND_PORT, ROUTER_BACKEND_PORT + 1, ... before the
+router workers fork, restarts any that exit, and stops them on shutdown. The
+router listens on PORT (5008). Routing is a pure function of the clientId
+and backend health, so ROUTER_WORKERS router processes can share the port.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROUTER_PROCESSES = int(os.environ.get('ROUTER_PROCESSES', str(os.cpu_count() or 1)))
+ROUTER_BACKEND_PORT = int(os.environ.get('ROUTER_BACKEND_PORT', '5101'))
+
+wsgi_app = 'router:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', '5008')}"
+workers = int(os.environ.get('ROUTER_WORKERS', '2'))
+threads = int(os.environ.get('ROUTER_THREADS', '32'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('WEB_TIMEOUT', '120'))
+keepalive = 5
+errorlog = '-'
+
+_backends = []
+_stopping = threading.Event()
+
+if not os.environ.get('ROUTER_BACKENDS'):
+    os.environ['ROUTER_BACKENDS'] = ','.join(
+        f'http://127.0.0.1:{ROUTER_BACKEND_PORT + i}' for i in range(ROUTER_PROCESSES))
+    _backends = [None] * ROUTER_PROCESSES
+
+
+def _start_backend(server, index):
+    env = dict(os.environ, PORT=str(ROUTER_BACKEND_PORT + index), WEB_WORKERS='1')
+    env.pop('ROUTER_BACKENDS', None)
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                                '--bind', f'127.0.0.1:{ROUTER_BACKEND_PORT + index}'], env=env)
+    server.log.info(f"Started backend {index} (pid {process.pid}) on port {ROUTER_BACKEND_PORT + index}")
+    return process
+
+
+def _supervise(server):
+    while not _stopping.wait(2.0):
+        for index, process in enumerate(_backends):
+            if process.poll() is not None:
+                server.log.warning(f"Backend {index} exited with {process.returncode}, restarting")
+                _backends[index] = _start_backend(server, index)
+
+
+def on_starting(server):
+    if not _backends:
+        return
+    for index in range(len(_backends)):
+        _backends[index] = _start_backend(server, index)
+    threading.Thread(target=_supervise, args=(server,), daemon=True).start()
+
+
+def on_exit(server):
+    _stopping.set()
+    for process in _backends:
+        if process is not None and process.poll() is None:
+            process.terminate()
+    deadline = time.time() + 30
+    for process in _backends:
+        if process is not None:
+            try:
+                process.wait(max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                process.kill()
@@ -0,0 +1,212 @@
+"""
+router.py - Sticky front router for multi-process dynamic-phrases deployments
+
+Client sessions (frame buffers, sentences, cooldowns, Holistic trackers) live
+in the process that created them, so every frame of a client has to reach the
+same backend process. The router picks the backend for each request by
+rendezvous hashing of its clientId over the healthy backends, so:
+
+- a client sticks to one backend for as long as that backend is up,
+- adding or losing a backend only moves the clients that hashed to it
+  (they start a fresh session on their new backend),
+- any number of router workers agree on the routing without sharing state.
+
+The clientId is read from the ``clientId`` query parameter or ``X-Client-Id``
+header when present, otherwise from the JSON body (as the UI sends it).
+/ws connections are proxied to the client's backend for their lifetime.
+
+Run through gunicorn with router.conf.py, which also starts the backends:
+
+    ROUTER_PROCESSES=4 gunicorn -c router.conf.py
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, request, jsonify
+from flask_sock import Sock
+from simple_websocket import Client, ConnectionClosed
+from logsetup import configure_logging
+
+configure_logging('router')
+logger = logging.getLogger(__name__)
+
+# Backend base URLs, e.g. "http://127.0.0.1:5101,http://127.0.0.1:5102"
+# (router.conf.py fills this in for the backends it starts)
+ROUTER_BACKENDS = [url.strip().rstrip('/') for url in os.environ.get('ROUTER_BACKENDS', '').split(',') if url.strip()]
+ROUTER_HEALTH_PATH = os.environ.get('ROUTER_HEALTH_PATH', '/ready')
+ROUTER_HEALTH_INTERVAL = float(os.environ.get('ROUTER_HEALTH_INTERVAL', '2'))
+ROUTER_TIMEOUT = float(os.environ.get('ROUTER_TIMEOUT', '30'))
+ROUTER_POOL_SIZE = int(os.environ.get('ROUTER_POOL_SIZE', '32'))
+
+# Hop-by-hop headers are not forwarded in either direction
+HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'content-encoding',
+               'host', 'upgrade', 'proxy-authorization', 'proxy-authenticate', 'te', 'trailer'}
+
+
+class BackendPool:
+    """Backends with health checks and rendezvous (highest random weight) hashing"""
+
+    def __init__(self, backends, health_path, interval, pool_size):
+        if not backends:
+            raise ValueError("No backends configured (set ROUTER_BACKENDS or ROUTER_PROCESSES)")
+        self.backends = list(backends)
+        self.health_path = health_path
+        self.interval = interval
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.backends), pool_maxsize=max(1, pool_size))
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self._healthy = set(self.backends)
+        self._requests = {backend: 0 for backend in self.backends}
+        self._errors = {backend: 0 for backend in self.backends}
+        self._thread = threading.Thread(target=self._check_loop, name='router-health', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _weight(client_id, backend):
+        digest = hashlib.blake2b(f'{client_id}|{backend}'.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def backend_for(self, client_id):
+        """The healthy backend with the highest weight for this client"""
+        with self._lock:
+            candidates = self._healthy or self.backends
+            backend = max(candidates, key=lambda b: self._weight(client_id, b))
+            self._requests[backend] += 1
+        return backend
+
+    def record_error(self, backend):
+        with self._lock:
+            self._errors[backend] += 1
+            self._healthy.discard(backend)
+
+    def _check_loop(self):
+        while True:
+            for backend in self.backends:
+                try:
+                    healthy = self.http.get(backend + self.health_path, timeout=1.0).ok
+                except requests.RequestException:
+                    healthy = False
+                with self._lock:
+                    was_healthy = backend in self._healthy
+                    if healthy:
+                        self._healthy.add(backend)
+                    else:
+                        self._healthy.discard(backend)
+                if healthy != was_healthy:
+                    logger.info(f"Backend {backend} is {'up' if healthy else 'down'}")
+            time.sleep(self.interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                backend: {
+                    'healthy': backend in self._healthy,
+                    'requests': self._requests[backend],
+                    'errors': self._errors[backend]
+                } for backend in self.backends
+            }
+
+
+app = Flask(__name__)
+sock = Sock(app)
+pool = BackendPool(ROUTER_BACKENDS, ROUTER_HEALTH_PATH, ROUTER_HEALTH_INTERVAL, ROUTER_POOL_SIZE)
+
+
+def request_client_id():
+    """clientId from the query string, X-Client-Id header or JSON body ('default' like app.py)"""
+    client_id = request.args.get('clientId') or request.headers.get('X-Client-Id')
+    if client_id:
+        return client_id
+    data = request.get_json(silent=True) if request.is_json else None
+    if isinstance(data, dict) and data.get('clientId'):
+        return str(data['clientId'])
+    return 'default'
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Routing counters plus each backend's own /stats"""
+    backends = {}
+    for backend in pool.backends:
+        try:
+            backends[backend] = pool.http.get(backend + '/stats', timeout=2.0).json()
+        except (requests.RequestException, ValueError) as e:
+            backends[backend] = {'success': False, 'error': str(e)}
+    return jsonify({'router': pool.stats(), 'backends': backends, 'success': True})
+
+
+@app.route('/', defaults={'path': ''}, methods=['GET', 'POST', 'OPTIONS'])
+@app.route('/<path:path>', methods=['GET', 'POST', 'OPTIONS'])
+def forward(path):
+    """Forward any other request to the client's backend"""
+    backend = pool.backend_for(request_client_id())
+    headers = {name: value for name, value in request.headers.items() if name.lower() not in HOP_HEADERS}
+    try:
+        upstream = pool.http.request(request.method, f'{backend}/{path}', params=request.args,
+                                     data=request.get_data(), headers=headers, timeout=ROUTER_TIMEOUT)
+    except requests.RequestException as e:
+        pool.record_error(backend)
+        logger.warning(f"Backend {backend} failed: {e}")
+        return jsonify({'error': 'Backend unavailable', 'success': False}), 502
+    response = Response(upstream.content, status=upstream.status_code)
+    for name, value in upstream.headers.items():
+        if name.lower() not in HOP_HEADERS:
+            response.headers[name] = value
+    response.headers['X-Backend'] = backend
+    return response
+
+
+def close_quietly(ws):
+    try:
+        ws.close()
+    except ConnectionClosed:
+        pass
+
+
+@sock.route('/ws')
+def forward_stream(ws):
+    """Proxy a /ws connection to the client's backend in both directions"""
+    # Connections without a clientId get a private session on the backend,
+    # so any backend will do; spread them with a random key
+    client_id = request.args.get('clientId') or uuid.uuid4().hex
+    backend = pool.backend_for(client_id)
+    url = backend.replace('http', 'ws', 1) + '/ws'
+    if request.query_string:
+        url += '?' + request.query_string.decode('utf-8')
+    try:
+        upstream = Client(url)
+    except Exception as e:
+        pool.record_error(backend)
+        logger.warning(f"Backend {backend} refused WebSocket: {e}")
+        ws.close(reason=1011, message='Backend unavailable')
+        return
+
+    def pump_down():
+        try:
+            while True:
+                message = upstream.receive()
+                if message is not None:
+                    ws.send(message)
+        except ConnectionClosed:
+            pass
+        finally:
+            close_quietly(ws)
+
+    threading.Thread(target=pump_down, name='router-ws', daemon=True).start()
+    try:
+        while True:
+            message = ws.receive()
+            if message is not None:
+                upstream.send(message)
+    except ConnectionClosed:
+        pass
+    finally:
+        close_quietly(upstream)
@@ -0,0 +1,45 @@
+"""
+gunicorn.conf.py - Production server settings for the dynamic signs service
+
+    gunicorn -c gunicorn.conf.py
+
+Serves app:app with WEB_WORKERS processes of WEB_THREADS threads each
+(gthread workers). The app is not preloaded: every worker imports app itself
+after the fork, so each one loads its own action model, Holistic pool and
+prediction and notification workers. TensorFlow and MediaPipe state is never
+shared across fork.
+
+Client sessions (frame buffers, sentences, trackers) live in the worker that
+created them, so all of a client's frames must reach the same worker. Keep
+WEB_WORKERS at 1 unless requests are routed by clientId, and scale with
+threads, PREDICTION_WORKERS and more containers instead.
+"""
+
+import os
+import time
+
+wsgi_app = 'app:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_WORKERS', '1'))
+threads = int(os.environ.get('WEB_THREADS', '8'))
+worker_class = 'gthread'
+
+# Load TensorFlow and MediaPipe in each worker after fork, never in the master
+preload_app = False
+
+# Model loading happens on worker boot, so allow a slow first start
+timeout = int(os.environ.get('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+reload = os.environ.get('WEB_RELOAD', 'false').lower() in ('1', 'true', 'yes')
+accesslog = '-' if os.environ.get('WEB_ACCESS_LOG', 'false').lower() in ('1', 'true', 'yes') else None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    worker.boot_started = time.perf_counter()
+
+
+def post_worker_init(worker):
+    elapsed = time.perf_counter() - getattr(worker, 'boot_started', time.perf_counter())
+    worker.log.info(f"Worker {worker.pid} ready in {elapsed:.1f}s ({threads} threads)")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+stub_downstream.py - Local stand-in for the conversation and Gemini services
+
+Serves the two endpoints app.py calls, so sentence delivery can be exercised
+without the real services:
+
+    POST /api/sentence_update     (conversation service, CONVERSATION_SERVICE_URL)
+    POST /process_sign_sentence   (Gemini integration, GEMINI_SERVICE_URL)
+    GET  /received                updates received so far, per client
+
+Latency and failures can be injected to check that /predict is unaffected by
+a slow or flaky downstream and that retries, coalescing and the outbox limit
+show up in the 'notifications' section of GET /stats.
+
+Usage:
+    python stub_downstream.py --port 5001 --delay 1.5 --fail-rate 0.3
+    CONVERSATION_SERVICE_URL=http://localhost:5001/api/sentence_update python app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real services
+    delay = 0.0
+    fail_rate = 0.0
+    received = {}
+    counts = {'requests': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path != '/received':
+            return self._reply(404, {'success': False, 'error': 'Not found'})
+        with self.lock:
+            self._reply(200, {'counts': dict(self.counts), 'received': self.received})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', '0'))
+        data = json.loads(self.rfile.read(length) or b'{}')
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.counts['requests'] += 1
+            if random.random() < self.fail_rate:
+                self.counts['failed'] += 1
+                return self._reply(503, {'success': False, 'error': 'Injected failure'})
+            self.received.setdefault(str(data.get('clientId')), []).append(data.get('sentence'))
+
+        if self.path == '/api/sentence_update':
+            return self._reply(200, {'success': True})
+        if self.path == '/process_sign_sentence':
+            return self._reply(200, {'success': True, 'response': f"(stub) {' '.join(data.get('sentence', []))}"})
+        return self._reply(404, {'success': False, 'error': 'Not found'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub conversation/Gemini services for local testing")
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    StubHandler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer(('0.0.0.0', args.port), StubHandler)
+    print(f"Stub downstream listening on port {args.port} (delay {args.delay}s, fail rate {args.fail_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+gunicorn.conf.py - Production server settings for the static signs service
+
+    gunicorn -c gunicorn.conf.py
+
+Serves simple_server:app with WEB_WORKERS processes of WEB_THREADS threads
+each (gthread workers). The app is not preloaded: every worker imports
+simple_server itself after the fork, so each one loads its own copy of the
+classifier, Hands pool and batching thread. TensorFlow and MediaPipe state is
+never shared across fork. Requests are stateless, so any number of workers
+can serve any client; as a starting point use one worker per 1-2 cores and
+keep WEB_WORKERS x TF_INTRA_OP_THREADS at or below the core count.
+"""
+
+import os
+import time
+
+wsgi_app = 'simple_server:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_WORKERS', '2'))
+threads = int(os.environ.get('WEB_THREADS', '8'))
+worker_class = 'gthread'
+
+# Load TensorFlow and MediaPipe in each worker after fork, never in the master
+preload_app = False
+
+# Model loading happens on worker boot, so allow a slow first start
+timeout = int(os.environ.get('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+reload = os.environ.get('WEB_RELOAD', 'false').lower() in ('1', 'true', 'yes')
+accesslog = '-' if os.environ.get('WEB_ACCESS_LOG', 'false').lower() in ('1', 'true', 'yes') else None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    worker.boot_started = time.perf_counter()
+
+
+def post_worker_init(worker):
+    elapsed = time.perf_counter() - getattr(worker, 'boot_started', time.perf_counter())
+    worker.log.info(f"Worker {worker.pid} ready in {elapsed:.1f}s ({threads} threads)")
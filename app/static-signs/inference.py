@@ -0,0 +1,355 @@
+"""
+inference.py - Pluggable inference backends for the Keras sign classifiers
+
+Backends (selected with the INFERENCE_BACKEND environment variable):
+    keras        model.predict, the reference implementation
+    tf_function  direct model call compiled with tf.function
+    tflite       TFLite interpreter converted from the .h5 model at startup
+                 (cached next to the .h5 file as .tflite)
+    numpy        pure-NumPy forward pass for small sequential models
+                 (Dense, LayerNormalization, BatchNormalization, LSTM, ...)
+
+Every backend exposes ``predict(inputs) -> np.ndarray`` with the same shape
+as ``model.predict``. If a backend cannot be built for a model,
+``create_engine`` falls back to the Keras backend.
+
+warm_up runs the batch sizes a server uses through an engine at startup so
+first requests do not pay for tracing.
+
+Parity check against the Keras reference:
+    python inference.py hand_landmarks.h5 --backends tf_function tflite numpy
+
+Convert and cache the TFLite model ahead of time (e.g. during docker build):
+    python inference.py hand_landmarks.h5 --convert
+"""
+
+import os
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BACKENDS = ('keras', 'tf_function', 'tflite', 'numpy')
+DEFAULT_BACKEND = 'tf_function'
+
+
+class KerasEngine:
+    """Reference backend: Keras' full predict loop"""
+    name = 'keras'
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, inputs):
+        return np.asarray(self.model.predict(np.asarray(inputs, dtype=np.float32), verbose=0))
+
+
+class TFFunctionEngine:
+    """Direct model call compiled once with tf.function (no predict loop overhead)"""
+    name = 'tf_function'
+
+    def __init__(self, model):
+        import tensorflow as tf
+        self.model = model
+        signature = [tf.TensorSpec([None] + list(model.input_shape[1:]), tf.float32)]
+        self._fn = tf.function(lambda x: model(x, training=False), input_signature=signature)
+
+    def predict(self, inputs):
+        return self._fn(np.asarray(inputs, dtype=np.float32)).numpy()
+
+
+class TFLiteEngine:
+    """TFLite interpreter converted from the Keras model"""
+    name = 'tflite'
+
+    def __init__(self, model, model_path=None):
+        import tensorflow as tf
+        content = self._load_or_convert(tf, model, model_path)
+        self._interpreter = tf.lite.Interpreter(model_content=content)
+        self._interpreter.allocate_tensors()
+        self._input_index = self._interpreter.get_input_details()[0]['index']
+        self._output_index = self._interpreter.get_output_details()[0]['index']
+        self._input_shape = None
+        # A single interpreter is not thread-safe
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_or_convert(tf, model, model_path):
+        tflite_path = os.path.splitext(model_path)[0] + '.tflite' if model_path else None
+        if (tflite_path and os.path.exists(tflite_path)
+                and os.path.getmtime(tflite_path) >= os.path.getmtime(model_path)):
+            logger.info(f"Loading cached TFLite model from {tflite_path}")
+            with open(tflite_path, 'rb') as f:
+                return f.read()
+
+        logger.info("Converting Keras model to TFLite")
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        # Recurrent layers may need TF ops that have no TFLite builtin equivalent
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS,
+            tf.lite.OpsSet.SELECT_TF_OPS
+        ]
+        content = converter.convert()
+
+        if tflite_path:
+            try:
+                with open(tflite_path, 'wb') as f:
+                    f.write(content)
+            except OSError as e:
+                logger.warning(f"Could not cache TFLite model at {tflite_path}: {e}")
+        return content
+
+    def predict(self, inputs):
+        inputs = np.asarray(inputs, dtype=np.float32)
+        with self._lock:
+            if self._input_shape != inputs.shape:
+                self._interpreter.resize_tensor_input(self._input_index, inputs.shape)
+                self._interpreter.allocate_tensors()
+                self._input_shape = inputs.shape
+            self._interpreter.set_tensor(self._input_index, inputs)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index).copy()
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'elu': lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0.0))),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'softmax': _softmax,
+}
+
+
+def _activation(name):
+    if name not in _ACTIVATIONS:
+        raise NotImplementedError(f"Unsupported activation for numpy backend: {name}")
+    return _ACTIVATIONS[name]
+
+
+def _dense(config, weights):
+    kernel = weights[0].astype(np.float32)
+    bias = weights[1].astype(np.float32) if config.get('use_bias', True) else 0.0
+    act = _activation(config.get('activation', 'linear'))
+    return lambda x: act(x @ kernel + bias)
+
+
+def _layer_norm(config, weights):
+    axis = config.get('axis', -1)
+    axes = tuple(axis) if isinstance(axis, (list, tuple)) else (axis,)
+    eps = config.get('epsilon', 1e-3)
+    weights = list(weights)
+    gamma = weights.pop(0).astype(np.float32) if config.get('scale', True) else None
+    beta = weights.pop(0).astype(np.float32) if config.get('center', True) else None
+
+    def forward(x):
+        norm_axes = tuple(a if a >= 0 else x.ndim + a for a in axes)
+        shape = [x.shape[d] if d in norm_axes else 1 for d in range(x.ndim)]
+        shape[0] = 1
+        mean = x.mean(axis=norm_axes, keepdims=True)
+        var = x.var(axis=norm_axes, keepdims=True)
+        out = (x - mean) / np.sqrt(var + eps)
+        if gamma is not None:
+            out = out * gamma.reshape(shape)
+        if beta is not None:
+            out = out + beta.reshape(shape)
+        return out
+    return forward
+
+
+def _batch_norm(config, weights):
+    eps = config.get('epsilon', 1e-3)
+    weights = list(weights)
+    gamma = weights.pop(0) if config.get('scale', True) else 1.0
+    beta = weights.pop(0) if config.get('center', True) else 0.0
+    mean, var = weights
+    scale = (gamma / np.sqrt(var + eps)).astype(np.float32)
+    shift = (beta - mean * scale).astype(np.float32)
+    return lambda x: x * scale + shift
+
+
+class _LSTMCell:
+    """Weights and single-step update of a Keras LSTM layer"""
+
+    def __init__(self, config, weights):
+        self.kernel = weights[0].astype(np.float32)
+        self.recurrent = weights[1].astype(np.float32)
+        self.bias = weights[2].astype(np.float32) if config.get('use_bias', True) else 0.0
+        self.units = self.recurrent.shape[0]
+        self.act = _activation(config.get('activation', 'tanh'))
+        self.rec_act = _activation(config.get('recurrent_activation', 'sigmoid'))
+        self.return_sequences = config.get('return_sequences', False)
+
+    def step(self, projected, h, c):
+        """Advance (h, c) by one timestep given the input already projected by the kernel"""
+        units = self.units
+        z = projected + h @ self.recurrent
+        i = self.rec_act(z[:, :units])
+        f = self.rec_act(z[:, units:2 * units])
+        g = self.act(z[:, 2 * units:3 * units])
+        o = self.rec_act(z[:, 3 * units:])
+        c = f * c + i * g
+        return o * self.act(c), c
+
+
+def _lstm(config, weights):
+    cell = _LSTMCell(config, weights)
+
+    def forward(x):
+        batch, steps = x.shape[0], x.shape[1]
+        # Project every timestep through the input kernel in one matmul
+        projected = x @ cell.kernel + cell.bias
+        h = np.zeros((batch, cell.units), dtype=np.float32)
+        c = np.zeros((batch, cell.units), dtype=np.float32)
+        outputs = []
+        for t in range(steps):
+            h, c = cell.step(projected[:, t], h, c)
+            if cell.return_sequences:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if cell.return_sequences else h
+    return forward
+
+
+_NUMPY_LAYERS = {
+    'Dense': _dense,
+    'LayerNormalization': _layer_norm,
+    'BatchNormalization': _batch_norm,
+    'LSTM': _lstm,
+    'Flatten': lambda config, weights: (lambda x: x.reshape(x.shape[0], -1)),
+    'Reshape': lambda config, weights: (lambda x: x.reshape((x.shape[0],) + tuple(config['target_shape']))),
+    'Activation': lambda config, weights: _activation(config['activation']),
+    'Softmax': lambda config, weights: _softmax,
+    'Dropout': None,
+    'InputLayer': None,
+}
+
+
+class NumpyEngine:
+    """Pure-NumPy forward pass for small sequential models"""
+    name = 'numpy'
+
+    def __init__(self, model):
+        if len(model.inputs) != 1 or len(model.outputs) != 1:
+            raise NotImplementedError("numpy backend only supports single-input, single-output models")
+        self._ops = []
+        for layer in model.layers:
+            layer_type = layer.__class__.__name__
+            if layer_type not in _NUMPY_LAYERS:
+                raise NotImplementedError(f"Unsupported layer for numpy backend: {layer_type}")
+            build = _NUMPY_LAYERS[layer_type]
+            if build is not None:
+                self._ops.append(build(layer.get_config(), layer.get_weights()))
+
+    def predict(self, inputs):
+        x = np.asarray(inputs, dtype=np.float32)
+        for op in self._ops:
+            x = op(x)
+        return x
+
+
+def create_engine(model, backend=None, model_path=None):
+    """Build the requested inference backend, falling back to Keras on failure"""
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend not in INFERENCE_BACKENDS:
+        logger.warning(f"Unknown inference backend '{backend}', using keras")
+        backend = 'keras'
+    try:
+        if backend == 'tf_function':
+            return TFFunctionEngine(model)
+        if backend == 'tflite':
+            return TFLiteEngine(model, model_path)
+        if backend == 'numpy':
+            return NumpyEngine(model)
+    except Exception as e:
+        logger.warning(f"Could not create '{backend}' inference backend ({e}), using keras")
+    return KerasEngine(model)
+
+
+def warmup_batch_sizes(max_batch_size):
+    """Powers of two up to ``max_batch_size`` (plus ``max_batch_size`` itself)"""
+    sizes, size = [], 1
+    while size < max_batch_size:
+        sizes.append(size)
+        size *= 2
+    return sizes + [max(1, max_batch_size)]
+
+
+def warm_up(engine, sample_shape, batch_sizes):
+    """Run zero batches of each size through ``engine`` before serving traffic.
+
+    The first call for a shape pays one-off costs (graph tracing, TFLite
+    tensor reallocation, kernel selection), so running every batch size the
+    server will use keeps them off real requests. Returns the time taken per
+    batch size in ms.
+    """
+    timings = {}
+    for size in batch_sizes:
+        start = time.perf_counter()
+        engine.predict(np.zeros((size,) + tuple(sample_shape), dtype=np.float32))
+        timings[size] = round((time.perf_counter() - start) * 1000, 3)
+    return timings
+
+
+def check_parity(model, engines, samples=32, atol=1e-4, seed=0):
+    """Compare each engine's outputs against Keras model.predict on random inputs.
+
+    Returns a dict mapping backend name to (max_abs_diff, argmax_agreement, passed).
+    """
+    rng = np.random.default_rng(seed)
+    inputs = rng.random((samples,) + tuple(model.input_shape[1:]), dtype=np.float32)
+    reference = KerasEngine(model).predict(inputs)
+    report = {}
+    for engine in engines:
+        outputs = np.concatenate([engine.predict(inputs[i:i + 1]) for i in range(samples)])
+        max_diff = float(np.max(np.abs(outputs - reference)))
+        agreement = float(np.mean(np.argmax(outputs, axis=-1) == np.argmax(reference, axis=-1)))
+        report[engine.name] = (max_diff, agreement, max_diff <= atol)
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Check inference backends against Keras model.predict")
+    parser.add_argument('model_path', help="Path to the Keras .h5 model")
+    parser.add_argument('--backends', nargs='+', default=['tf_function', 'tflite', 'numpy'],
+                        choices=[b for b in INFERENCE_BACKENDS if b != 'keras'])
+    parser.add_argument('--samples', type=int, default=32)
+    parser.add_argument('--atol', type=float, default=1e-4)
+    parser.add_argument('--convert', action='store_true',
+                        help="Only convert and cache the TFLite model, then exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    import tensorflow as tf
+    keras_model = tf.keras.models.load_model(args.model_path)
+
+    if args.convert:
+        TFLiteEngine(keras_model, args.model_path)
+        sys.exit(0)
+
+    engines = []
+    for name in args.backends:
+        engine = create_engine(keras_model, name, args.model_path)
+        if engine.name != name:
+            print(f"{name:12s} FAILED to build")
+            continue
+        engines.append(engine)
+
+    failed = len(engines) != len(args.backends)
+    for name, (max_diff, agreement, passed) in check_parity(keras_model, engines, args.samples, args.atol).items():
+        print(f"{name:12s} max_abs_diff={max_diff:.2e} argmax_agreement={agreement:.1%} {'OK' if passed else 'MISMATCH'}")
+        failed = failed or not passed
+    sys.exit(1 if failed else 0)
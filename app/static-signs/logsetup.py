@@ -0,0 +1,232 @@
+"""
+logsetup.py - Structured, non-blocking logging for the recognition services
+
+configure_logging() replaces the root handlers with a queue handler. A
+request thread only builds the log record and enqueues it. One listener
+thread formats records and writes them to stdout, so a slow stdout (e.g. a
+Docker log driver under load) never stalls request threads. When the queue
+is full, records are dropped and counted instead of blocking.
+
+Records are written one JSON object per line (LOG_FORMAT=json, the default)
+or as plain text (LOG_FORMAT=text). Structured fields go in
+``extra={'fields': {...}}`` or through log_event(). Long strings, bytes
+and arrays in those fields are truncated to LOG_MAX_FIELD_CHARS, so
+payloads such as base64 frames never reach the log.
+
+log_event() also samples per route: LOG_SAMPLE_RATES="/predict=0.01,*=1"
+keeps 1% of the /predict lines. Warnings and errors are never sampled out.
+set_level() and set_sample_rate() change the settings at runtime; the
+services expose both as POST /log_level.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_MAX_FIELD_CHARS = int(os.environ.get('LOG_MAX_FIELD_CHARS', '200'))
+LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def truncate(value, limit=LOG_MAX_FIELD_CHARS):
+    """Copy of ``value`` with long strings, bytes and sequences cut down for logging"""
+    if isinstance(value, str):
+        return value if len(value) <= limit else f'{value[:limit]}...<{len(value)} chars>'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'<{len(value)} bytes>'
+    if isinstance(value, dict):
+        return {str(key): truncate(item, limit) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [truncate(item, limit) for item in value[:limit]]
+        if len(value) > limit:
+            items.append(f'...<{len(value)} items>')
+        return items
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    if hasattr(value, 'shape') and hasattr(value, 'dtype'):
+        return f'<array {value.dtype} {tuple(value.shape)}>'
+    return truncate(str(value), limit)
+
+
+def record_fields(record):
+    """Structured fields attached to a record (``extra={'fields': ...}`` or plain extras)"""
+    fields = dict(getattr(record, 'fields', None) or {})
+    for key, value in vars(record).items():
+        if key not in _STANDARD_ATTRS and key != 'fields':
+            fields[key] = value
+    return truncate(fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, fields"""
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'service': self.service,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': truncate(record.getMessage(), max(LOG_MAX_FIELD_CHARS, 2000)),
+        }
+        entry.update(record_fields(record))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text with structured fields appended as key=value"""
+
+    def __init__(self, service):
+        super().__init__(f'%(asctime)s %(levelname)s [{service}] %(name)s: %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        fields = record_fields(record)
+        if fields:
+            extra = ' '.join(f'{key}={json.dumps(value, default=str)}' for key, value in fields.items())
+            head, sep, tail = text.partition('\n')
+            text = f'{head} {extra}{sep}{tail}'
+        return text
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full.
+
+    Records are handed over in-process, so formatting, including the
+    traceback of ``exc_info``, is left to the listener thread.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class Sampler:
+    """Per-route keep probabilities for log_event ('*' is the default rate)"""
+
+    def __init__(self, rates):
+        self.rates = {'*': 1.0}
+        self.rates.update(rates)
+        self.kept = {}
+        self.skipped = {}
+        self._lock = threading.Lock()
+
+    def rate(self, route):
+        return self.rates.get(route, self.rates['*'])
+
+    def keep(self, route):
+        rate = self.rate(route)
+        kept = rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+        with self._lock:
+            counts = self.kept if kept else self.skipped
+            counts[route] = counts.get(route, 0) + 1
+        return kept
+
+    def stats(self):
+        with self._lock:
+            return {'rates': dict(self.rates), 'kept': dict(self.kept), 'skipped': dict(self.skipped)}
+
+
+def parse_sample_rates(spec):
+    """{'/predict': 0.01, ...} from "route=rate,route=rate" """
+    rates = {}
+    for item in spec.split(','):
+        route, sep, rate = item.strip().rpartition('=')
+        if sep and route:
+            rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+_handler = None
+_listener = None
+_sampler = Sampler({})
+
+
+def configure_logging(service, sample_rates=None):
+    """Route all logging through the queue listener; LOG_SAMPLE_RATES overrides ``sample_rates``"""
+    global _handler, _listener, _sampler
+    if _listener is not None:
+        return
+    rates = dict(sample_rates or {})
+    rates.update(parse_sample_rates(LOG_SAMPLE_RATES))
+    _sampler = Sampler(rates)
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter(service) if LOG_FORMAT == 'text' else JsonFormatter(service))
+    _handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def log_event(logger, route, message, level=logging.INFO, **fields):
+    """Log ``message`` with structured ``fields``, sampled at the route's rate below WARNING"""
+    if not logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING and not _sampler.keep(route):
+        return
+    fields['route'] = route
+    logger.log(level, message, extra={'fields': fields})
+
+
+def set_level(level, name=None):
+    """Set the level of the root logger (or logger ``name``) at runtime"""
+    level = str(level).upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"Unknown log level: {level}")
+    logging.getLogger(name).setLevel(level)
+
+
+def set_sample_rate(route, rate):
+    rate = float(rate)
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"Sample rate must be between 0 and 1, got {rate}")
+    _sampler.rates[route] = rate
+
+
+def logging_stats():
+    root = logging.getLogger()
+    return {
+        'level': logging.getLevelName(root.level),
+        'loggers': {name: logging.getLevelName(logger.level)
+                    for name, logger in logging.root.manager.loggerDict.items()
+                    if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET},
+        'queued': _handler.queue.qsize() if _handler is not None else 0,
+        'dropped': _handler.dropped if _handler is not None else 0,
+        'sampling': _sampler.stats()
+    }
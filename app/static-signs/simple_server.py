@@ -1,16 +1,24 @@
 import os
+import time
+IMPORT_START = time.perf_counter()  # startup timing includes the heavy imports below
 import tensorflow as tf
 import absl.logging
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from tensorflow.keras.models import load_model
 import base64
-import io
-from PIL import Image
+import logging
 import cv2
 import mediapipe as mp
 import numpy as np
 import threading
+import queue
+from inference import create_engine, DEFAULT_BACKEND, warm_up, warmup_batch_sizes
+from decode import decode_base64, decode_frame
+from metrics import REGISTRY as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from logsetup import configure_logging, log_event, logging_stats, set_level, set_sample_rate
+from contextlib import contextmanager
+from concurrent.futures import Future
 
 # Disable TensorFlow logging
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
@@ -18,12 +26,78 @@ os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 absl.logging.set_verbosity(absl.logging.ERROR)
 tf.get_logger().setLevel('ERROR')
 
-print("Starting simple sign recognition server...")
+# TensorFlow thread pools per process (0 = TensorFlow's default). With several
+# server workers keep workers x intra-op threads within the core count
+TF_INTRA_OP_THREADS = int(os.environ.get('TF_INTRA_OP_THREADS', '0'))
+TF_INTER_OP_THREADS = int(os.environ.get('TF_INTER_OP_THREADS', '0'))
+if TF_INTRA_OP_THREADS:
+    tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+if TF_INTER_OP_THREADS:
+    tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+
+# Logging: JSON lines through a non-blocking queue, per-request events
+# sampled (see logsetup.py and LOG_* in the README)
+configure_logging('static-signs', sample_rates={'/predict': 0.01, '/predict_landmarks': 0.01})
+logger = logging.getLogger(__name__)
+
+logger.info("Starting simple sign recognition server...")
+
+# Inference backend for the classifier: keras, tf_function, tflite or numpy
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', DEFAULT_BACKEND)
 
 # Create Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+class StartupTracker:
+    """Startup phase timings and the readiness flag served by /ready.
+
+    ``phase(name)`` times a block of startup work and ``set_ready()`` marks
+    the end of warmup, so cold-start cost can be broken down and tracked.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.phases = {}
+        self.ready = False
+        self.ready_after = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = seconds
+
+    def set_ready(self):
+        with self._lock:
+            self.ready = True
+            self.ready_after = time.perf_counter() - self.started
+
+    def fail(self, error):
+        with self._lock:
+            self.error = str(error)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'error': self.error,
+                'uptime_s': round(time.perf_counter() - self.started, 3),
+                'ready_after_ms': round(self.ready_after * 1000, 3) if self.ready_after is not None else None,
+                'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()}
+            }
+
+startup = StartupTracker(IMPORT_START)
+startup.record('imports', time.perf_counter() - IMPORT_START)
+
 # Create a singleton class to manage the model - exactly like sign_recognition.py
 class ModelManager:
     _instance = None
@@ -39,11 +113,12 @@ class ModelManager:
     
     def __init__(self):
         self.model = None
+        self.engine = None
         self.is_loaded = False
         self.error = None
         self.load_model()
-        # Print the actual status after loading
-        print(f"ModelManager after initialization: model_loaded={self.is_loaded}, model=={self.model is not None}")
+        # Log the actual status after loading
+        logger.info(f"ModelManager after initialization: model_loaded={self.is_loaded}, model=={self.model is not None}")
     
     def load_model(self):
         try:
@@ -51,43 +126,166 @@ class ModelManager:
             current_dir = os.getcwd()
             model_path = os.path.join(current_dir, "hand_landmarks.h5")
             
-            print(f"ModelManager: Current directory: {current_dir}")
-            print(f"ModelManager: Model path: {model_path}")
-            print(f"ModelManager: Model file exists: {os.path.exists(model_path)}")
+            logger.info(f"ModelManager: Current directory: {current_dir}")
+            logger.info(f"ModelManager: Model path: {model_path}")
+            logger.info(f"ModelManager: Model file exists: {os.path.exists(model_path)}")
             
             # Try to load the model
             if os.path.exists(model_path):
-                print(f"ModelManager: Loading model from: {model_path}")
-                self.model = load_model(model_path)
+                logger.info(f"ModelManager: Loading model from: {model_path}")
+                with startup.phase('model_load'):
+                    self.model = load_model(model_path)
+                with startup.phase('engine_build'):
+                    self.engine = create_engine(self.model, INFERENCE_BACKEND, model_path)
+                logger.info(f"ModelManager: Using '{self.engine.name}' inference backend")
                 
-                # Verify model works
-                dummy_input = np.random.rand(1, 21, 3)
-                dummy_pred = self.model.predict(dummy_input)
-                print(f"ModelManager: ✅ MODEL LOADED SUCCESSFULLY! Prediction shape: {dummy_pred.shape}")
+                # The model is verified (and warmed up) by run_warmup before /ready reports ready
+                logger.info("ModelManager: ✅ MODEL LOADED SUCCESSFULLY!")
                 self.is_loaded = True
-                print(f"ModelManager: Setting is_loaded to {self.is_loaded}")
+                logger.info(f"ModelManager: Setting is_loaded to {self.is_loaded}")
             else:
-                print(f"ModelManager: ❌ ERROR: Model file not found at {model_path}")
+                logger.error(f"ModelManager: ❌ ERROR: Model file not found at {model_path}")
                 self.is_loaded = False
                 self.error = f"Model file not found at {model_path}"
         except Exception as e:
-            print(f"ModelManager: ❌ ERROR loading model: {str(e)}")
+            logger.exception(f"ModelManager: ❌ ERROR loading model: {str(e)}")
             self.is_loaded = False
             self.error = str(e)
     
     def get_model(self):
         return self.model
     
+    def get_engine(self):
+        return self.engine
+    
     def is_model_loaded(self):
         status = self.is_loaded and self.model is not None
-        print(f"ModelManager.is_model_loaded(): Returning {status}, self.is_loaded={self.is_loaded}, model is not None={self.model is not None}")
+        logger.debug(f"ModelManager.is_model_loaded(): Returning {status}, self.is_loaded={self.is_loaded}, model is not None={self.model is not None}")
         return status
 
 # Initialize MediaPipe
 mp_hands = mp.solutions.hands
-# We'll create a new Hands instance for each request to avoid timestamp issues
 mp_drawing = mp.solutions.drawing_utils
 
+# MediaPipe Hands pool settings (one long-lived detector per concurrent request)
+HANDS_POOL_SIZE = int(os.environ.get('HANDS_POOL_SIZE', '4'))
+HANDS_POOL_TIMEOUT = float(os.environ.get('HANDS_POOL_TIMEOUT', '5.0'))
+
+# Uploads are decoded (and downscaled) to at most this width before MediaPipe;
+# 0 keeps the uploaded resolution
+DECODE_TARGET_WIDTH = int(os.environ.get('DECODE_TARGET_WIDTH', '640'))
+
+class HandsPool:
+    """Bounded pool of long-lived MediaPipe Hands detectors.
+
+    Detectors run in static image mode, so they keep no timestamps between
+    calls and can be reused safely as long as only one thread uses a detector
+    at a time. Detectors are created lazily up to ``size`` and checked out per
+    request; checkout wait times are recorded to show contention.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._available = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _create(self):
+        return mp_hands.Hands(
+            static_image_mode=True,  # Always use static mode for single images
+            max_num_hands=1,
+            min_detection_confidence=0.5
+        )
+
+    def _acquire(self):
+        try:
+            return self._available.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._available.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise
+
+    def warm_up(self, image):
+        """Create every detector up front and run ``image`` through each one"""
+        detectors = []
+        try:
+            while True:
+                with self._lock:
+                    if self._created >= self.size:
+                        break
+                    self._created += 1
+                try:
+                    hands = self._create()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                detectors.append(hands)
+                hands.process(image)
+        finally:
+            for hands in detectors:
+                self._available.put(hands)
+        return len(detectors)
+
+    @contextmanager
+    def checkout(self):
+        """Check out a detector for the duration of a ``with`` block.
+
+        Raises ``queue.Empty`` if no detector frees up within ``timeout``.
+        """
+        start = time.perf_counter()
+        hands = self._acquire()
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        try:
+            yield hands
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._available.put(hands)
+
+    def stats(self):
+        with self._lock:
+            avg_wait = self._total_wait / self._checkouts if self._checkouts else 0.0
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(avg_wait * 1000, 3),
+                'max_wait_ms': round(self._max_wait * 1000, 3)
+            }
+
+hands_pool = HandsPool(HANDS_POOL_SIZE, HANDS_POOL_TIMEOUT)
+
 # Define classes
 classes = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
            'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J',
@@ -97,28 +295,297 @@ classes = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
 # Initialize the model manager - exactly like in sign_recognition.py
 model_manager = ModelManager.get_instance()
 
-# Hard-coded model status workaround
-MODEL_LOADED_GLOBAL = True
+# Prometheus metrics (GET /metrics); gauges read the live objects at scrape time
+STAGE_SECONDS = metrics_registry.histogram(
+    'sign_stage_seconds', "Time spent in each request pipeline stage", ['route', 'stage'])
+QUEUE_WAIT_SECONDS = metrics_registry.histogram(
+    'sign_queue_wait_seconds', "Time a landmark vector waited in the batcher", ['model'])
+INFERENCE_SECONDS = metrics_registry.histogram(
+    'sign_inference_seconds', "Time of one classifier forward pass (batch)", ['model', 'backend'])
+MODEL_INFERENCES = metrics_registry.counter(
+    'sign_model_inferences_total', "Landmark vectors run through each model", ['model', 'backend'])
+
+# Micro-batching settings for the landmark classifier
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '16'))
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', '5'))
+BATCH_RESULT_TIMEOUT = float(os.environ.get('BATCH_RESULT_TIMEOUT', '10.0'))
+
+class BatchPredictor:
+    """Micro-batching scheduler around the ModelManager's classifier.
+
+    Landmark tensors submitted by concurrent requests are collected for up to
+    ``window_ms`` (or until ``max_batch_size`` are waiting), run through the
+    model in a single forward pass, and each row of the output is handed back
+    to the request that submitted it.
+    """
+
+    def __init__(self, manager, max_batch_size, window_ms):
+        self.manager = manager
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = {}
+        self._batches = 0
+        self._items = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, input_data):
+        """Queue one (21, 3) or (1, 21, 3) landmark tensor; returns a Future."""
+        future = Future()
+        self._queue.put((np.asarray(input_data, dtype=np.float32).reshape(21, 3), future, time.perf_counter()))
+        return future
+
+    def predict(self, input_data, timeout=None):
+        """Submit a landmark tensor and block until its class scores are ready."""
+        return self.submit(input_data).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            futures = [future for _, future, _ in batch]
+            started = time.perf_counter()
+            for _, _, submitted in batch:
+                QUEUE_WAIT_SECONDS.observe(started - submitted, model='hand_landmarks')
+            try:
+                engine = self.manager.get_engine()
+                if engine is None:
+                    raise RuntimeError('Model not available')
+                inputs = np.stack([item for item, _, _ in batch])
+                outputs = engine.predict(inputs)
+                INFERENCE_SECONDS.observe(time.perf_counter() - started, model='hand_landmarks', backend=engine.name)
+                MODEL_INFERENCES.inc(len(batch), model='hand_landmarks', backend=engine.name)
+                for future, output in zip(futures, outputs):
+                    future.set_result(output)
+            except Exception as e:
+                logger.exception(f"BatchPredictor: ❌ ERROR running batch of {len(batch)}: {str(e)}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'window_ms': self.window * 1000.0,
+                'batches': self._batches,
+                'items': self._items,
+                'pending': self._queue.qsize(),
+                'avg_batch_size': round(self._items / self._batches, 3) if self._batches else 0.0,
+                'batch_size_histogram': dict(sorted(self._batch_sizes.items()))
+            }
+
+batch_predictor = BatchPredictor(model_manager, BATCH_MAX_SIZE, BATCH_WINDOW_MS)
+
+# Warmup: run the classifier at every batch size the batcher produces and
+# initialize every Hands detector before /ready reports ready
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+def run_warmup():
+    """Warm up the classifier and MediaPipe, then flip readiness"""
+    try:
+        if not model_manager.is_model_loaded():
+            raise RuntimeError(model_manager.error or 'Model not loaded')
+        if WARMUP_ENABLED:
+            with startup.phase('warmup_classifier'):
+                timings = warm_up(model_manager.get_engine(), (21, 3), warmup_batch_sizes(BATCH_MAX_SIZE))
+            logger.info(f"Warmup: classifier batch sizes (ms) {timings}")
+            with startup.phase('warmup_mediapipe'):
+                detectors = hands_pool.warm_up(np.zeros((480, 640, 3), dtype=np.uint8))
+            logger.info(f"Warmup: {detectors} Hands detectors initialized")
+        startup.set_ready()
+        logger.info(f"Server ready: {startup.stats()}")
+    except Exception as e:
+        startup.fail(e)
+        logger.error(f"Warmup: ❌ ERROR, server will not report ready: {str(e)}")
+
+threading.Thread(target=run_warmup, name='warmup', daemon=True).start()
+
+class StageTimer:
+    """Wall-clock timer for the stages of one request.
+
+    ``lap(name)`` charges the time since the previous lap (or the start) to
+    ``name``, so stages are timed without restructuring the code around them.
+    ``route`` labels the stages in the /metrics histograms.
+    """
+
+    def __init__(self, route=''):
+        self.route = route
+        self.start = self._last = time.perf_counter()
+        self.stages = {}
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def total(self):
+        return self._last - self.start
+
+    def as_ms(self):
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        timings['total'] = round(self.total() * 1000, 3)
+        return timings
+
+class StageStats:
+    """Running per-stage latency totals across requests, reported by /health"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, timer):
+        stages = list(timer.stages.items()) + [('total', timer.total())]
+        for name, seconds in stages:
+            STAGE_SECONDS.observe(seconds, route=timer.route, stage=name)
+        with self._lock:
+            for name, seconds in stages:
+                count, total, worst = self._stages.get(name, (0, 0.0, 0.0))
+                self._stages[name] = (count + 1, total + seconds, max(worst, seconds))
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': count,
+                    'avg_ms': round(total / count * 1000, 3),
+                    'max_ms': round(worst * 1000, 3)
+                } for name, (count, total, worst) in self._stages.items()
+            }
+
+stage_stats = StageStats()
+
+metrics_registry.gauge('sign_ready', "1 once the model is loaded and warmed up",
+                       function=lambda: int(startup.ready))
+metrics_registry.gauge('sign_queue_depth', "Work items waiting per queue", ['queue'],
+                       function=lambda: {('batcher',): batch_predictor.stats()['pending']})
+metrics_registry.gauge('sign_hands_in_use', "MediaPipe Hands detectors checked out by requests",
+                       function=lambda: hands_pool.stats()['in_use'])
+metrics_registry.counter('sign_hands_pool_timeouts_total', "Requests that found no free Hands detector",
+                         function=lambda: hands_pool.stats()['timeouts'])
+
+# Annotation settings: 'image' (annotated JPEG), 'landmarks' (coordinates for
+# client-side drawing) or 'none' (prediction only)
+ANNOTATE_MODES = ('image', 'landmarks', 'none')
+ANNOTATE_DEFAULT = os.environ.get('ANNOTATE_DEFAULT', 'image')
+ANNOTATE_MAX_WIDTH = int(os.environ.get('ANNOTATE_MAX_WIDTH', '320'))
+ANNOTATE_JPEG_QUALITY = int(os.environ.get('ANNOTATE_JPEG_QUALITY', '70'))
+HAND_CONNECTIONS_LIST = sorted([list(connection) for connection in mp_hands.HAND_CONNECTIONS])
+
+def get_annotate_mode(data):
+    """Resolve the annotation mode from the request body or ?annotate= query parameter"""
+    mode = data.get('annotate', request.args.get('annotate', ANNOTATE_DEFAULT))
+    if isinstance(mode, bool):
+        return 'image' if mode else 'none'
+    mode = str(mode).lower()
+    return mode if mode in ANNOTATE_MODES else ANNOTATE_DEFAULT
+
+def clamp_int(value, default, low, high):
+    """Parse an optional integer request field, clamped to [low, high]"""
+    try:
+        return min(max(int(value), low), high)
+    except (TypeError, ValueError):
+        return default
+
+def render_annotated_image(image_rgb, multi_hand_landmarks, max_width, quality):
+    """Draw hand landmarks on a downscaled copy of the frame and return it as base64 JPEG"""
+    height, width = image_rgb.shape[:2]
+    if width > max_width:
+        # Landmarks are normalized, so drawing on the downscaled frame is equivalent
+        new_height = max(1, int(round(height * max_width / width)))
+        annotated_image = cv2.resize(image_rgb, (max_width, new_height), interpolation=cv2.INTER_AREA)
+    else:
+        annotated_image = image_rgb.copy()
+    
+    for hand_landmarks in multi_hand_landmarks:
+        mp_drawing.draw_landmarks(
+            annotated_image,
+            hand_landmarks,
+            mp_hands.HAND_CONNECTIONS,
+            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+            mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
+        )
+    
+    _, buffer = cv2.imencode('.jpg', cv2.cvtColor(annotated_image, cv2.COLOR_RGB2BGR),
+                             [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return base64.b64encode(buffer).decode('utf-8')
+
+@app.route('/live', methods=['GET'])
+def live():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'alive', 'uptime_s': startup.stats()['uptime_s']})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: model loaded and warmup finished (503 until then)"""
+    state = startup.stats()
+    return jsonify(state), 200 if state['ready'] else 503
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Simple health check endpoint that confirms if model is loaded"""
-    # Always return true for model_loaded to fix frontend issues
+    """Health summary: model and readiness state plus runtime statistics"""
+    state = startup.stats()
     return jsonify({
-        'status': 'healthy',
-        'model_loaded': True,
-        'message': "Sign recognition server is running"
+        'status': 'healthy' if state['ready'] else ('error' if state['error'] else 'starting'),
+        'model_loaded': model_manager.is_model_loaded(),
+        'ready': state['ready'],
+        'startup': state,
+        'message': "Sign recognition server is running",
+        'inference_backend': model_manager.get_engine().name if model_manager.get_engine() else None,
+        'hands_pool': hands_pool.stats(),
+        'batcher': batch_predictor.stats(),
+        'stages': stage_stats.stats(),
+        'logging': logging_stats()
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for this worker process (text exposition format)"""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/log_level', methods=['GET', 'POST'])
+def log_level():
+    """Read or change logging at runtime for this worker process.
+
+    POST {"level": "DEBUG", "logger": "werkzeug", "sample_rates": {"/predict": 0.1}};
+    every key is optional and ``logger`` defaults to the root logger.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            if 'level' in data:
+                set_level(data['level'], data.get('logger'))
+            for route, rate in (data.get('sample_rates') or {}).items():
+                set_sample_rate(route, rate)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'logging': logging_stats(), 'success': True})
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Endpoint to predict signs from base64 image"""
     try:
+        timer = StageTimer('/predict')
         data = request.get_json()
-        print("RAW incoming data:", data)
-        image_data = data.get('image', '')
-        print("RAW image_data (first 100 chars):", image_data[:100], "length:", len(image_data))
-        print("Received prediction request")
         
         if not data or 'image' not in data:
             return jsonify({
@@ -128,59 +595,40 @@ def predict():
         
         # Process the image
         try:
-            # Get the model from the manager
-            model = model_manager.get_model()
-            if model is None:
+            # Make sure the model manager has a model to batch against
+            if model_manager.get_model() is None:
                 return jsonify({
                     'success': False,
                     'error': 'Model not available'
                 }), 500
             
-            # Convert base64 to image
+            # Decode straight to an RGB frame (important for MediaPipe) of at
+            # most DECODE_TARGET_WIDTH; grayscale and RGBA uploads become RGB
             image_data = data.get('image', '')
             if not image_data or len(image_data) < 10:
                 return jsonify({'success': False, 'error': 'Image data is empty or invalid'}), 400
-            if ',' in image_data:
-                image_data = image_data.split(',', 1)[1]
             try:
-                image_bytes = base64.b64decode(image_data)
-                image = Image.open(io.BytesIO(image_bytes))
-                image_np = np.array(image)
-            except Exception as e:
-                print(f'Error decoding image: {e}')
-                import traceback; traceback.print_exc()
+                image_bytes = decode_base64(image_data)
+                timer.lap('base64')
+                image_rgb = decode_frame(image_bytes, DECODE_TARGET_WIDTH, timer=timer)
+            except ValueError as e:
+                log_event(logger, '/predict', "Image decode error", level=logging.WARNING, error=str(e),
+                          image_chars=len(image_data))
                 return jsonify({'success': False, 'error': f'Image decode error: {str(e)}'}), 400
             
-            # Convert to RGB (important for MediaPipe)
-            image_rgb = cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB)
-            
-            # Create a new MediaPipe Hands instance for each request to avoid timestamp issues
-            with mp_hands.Hands(
-                static_image_mode=True,  # Always use static mode for single images
-                max_num_hands=1,
-                min_detection_confidence=0.5
-            ) as hands:
-                # Process with MediaPipe - use a fresh copy of the image
-                results = hands.process(image_rgb.copy())
+            # Borrow a long-lived MediaPipe Hands detector from the pool
+            try:
+                with hands_pool.checkout() as hands:
+                    results = hands.process(image_rgb)
+                timer.lap('hands')
+            except queue.Empty:
+                logger.warning("No MediaPipe Hands detector available (pool exhausted)")
+                return jsonify({
+                    'success': False,
+                    'error': 'Server busy, please retry'
+                }), 503
             
             if results.multi_hand_landmarks:
-                # Create a copy of the image for drawing
-                annotated_image = image_rgb.copy()
-                
-                # Draw hand landmarks
-                for hand_landmarks in results.multi_hand_landmarks:
-                    mp_drawing.draw_landmarks(
-                        annotated_image,
-                        hand_landmarks,
-                        mp_hands.HAND_CONNECTIONS,
-                        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                        mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
-                    )
-                
-                # Convert annotated image to base64
-                _, buffer = cv2.imencode('.jpg', cv2.cvtColor(annotated_image, cv2.COLOR_RGB2BGR))
-                annotated_image_base64 = base64.b64encode(buffer).decode('utf-8')
-                
                 landmarks = []
                 for hand_landmarks in results.multi_hand_landmarks:
                     for landmark in hand_landmarks.landmark:
@@ -188,41 +636,142 @@ def predict():
                 
                 # Reshape for model input
                 input_data = np.array(landmarks).reshape(1, 21, 3)
+                timer.lap('keypoints')
                 
-                # Get prediction
-                prediction = model.predict(input_data)
-                predicted_class = np.argmax(prediction, axis=1)[0]
+                # Get prediction (batched with other in-flight requests)
+                prediction = batch_predictor.predict(input_data, timeout=BATCH_RESULT_TIMEOUT)
+                timer.lap('classify')
+                predicted_class = int(np.argmax(prediction))
                 predicted_character = classes[predicted_class]
                 
-                print(f"Prediction successful: {predicted_character}")
-                
-                return jsonify({
+                response = {
                     'success': True,
                     'prediction': predicted_character,
                     'confidence': float(np.max(prediction)),
-                    'annotated_image': f'data:image/jpeg;base64,{annotated_image_base64}',
                     'landmarks': landmarks
-                })
+                }
+                
+                # Only pay for drawing and JPEG encoding when the client asks for it
+                annotate_mode = get_annotate_mode(data)
+                if annotate_mode == 'image':
+                    annotated_image_base64 = render_annotated_image(
+                        image_rgb,
+                        results.multi_hand_landmarks,
+                        clamp_int(data.get('annotate_width'), ANNOTATE_MAX_WIDTH, 32, 4096),
+                        clamp_int(data.get('annotate_quality'), ANNOTATE_JPEG_QUALITY, 1, 100)
+                    )
+                    response['annotated_image'] = f'data:image/jpeg;base64,{annotated_image_base64}'
+                    timer.lap('annotate')
+                elif annotate_mode == 'landmarks':
+                    response['hand_connections'] = HAND_CONNECTIONS_LIST
+                
+                body = jsonify(response)
+                timer.lap('serialize')
+                stage_stats.record(timer)
+                log_event(logger, '/predict', "Prediction successful", prediction=predicted_character,
+                          confidence=round(response['confidence'], 4), annotate=annotate_mode,
+                          timings_ms=timer.as_ms())
+                return body
             else:
-                print("No hand detected in image")
+                stage_stats.record(timer)
+                log_event(logger, '/predict', "No hand detected in image", timings_ms=timer.as_ms())
                 return jsonify({
                     'success': False,
                     'error': 'No hand detected'
                 })
                 
         except Exception as e:
-            print(f"Error processing image: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Error processing image: {str(e)}")
             return jsonify({
                 'success': False,
                 'error': f'Error processing image: {str(e)}'
             })
             
     except Exception as e:
-        print(f"Error in predict endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error in predict endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Landmark-only prediction settings
+LANDMARK_VECTOR_SIZE = 21 * 3
+LANDMARK_MAX_VECTORS = int(os.environ.get('LANDMARK_MAX_VECTORS', '64'))
+
+def parse_landmark_payload(req):
+    """Parse landmark vectors from a request into an (N, 21, 3) float32 array.
+
+    Accepts a raw little-endian float32 buffer (``application/octet-stream``)
+    holding one or more 63-float vectors, or JSON of the form
+    ``{"landmarks": [...]}`` where landmarks is a flat 63-float vector, a list
+    of 21 ``[x, y, z]`` points, or a list of either for a batch.
+    Raises ValueError on malformed input.
+    """
+    if req.mimetype == 'application/octet-stream':
+        body = req.get_data(cache=False)
+        if not body or len(body) % (LANDMARK_VECTOR_SIZE * 4):
+            raise ValueError(f'Binary body must be a multiple of {LANDMARK_VECTOR_SIZE} float32 values')
+        vectors = np.frombuffer(body, dtype='<f4')
+    else:
+        data = req.get_json(silent=True)
+        if not data or 'landmarks' not in data:
+            raise ValueError('No landmark data provided')
+        try:
+            vectors = np.asarray(data['landmarks'], dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError('Landmarks must be numeric')
+        if vectors.size == 0 or vectors.size % LANDMARK_VECTOR_SIZE:
+            raise ValueError(f'Landmarks must contain a multiple of {LANDMARK_VECTOR_SIZE} values')
+
+    vectors = vectors.reshape(-1, 21, 3)
+    if len(vectors) > LANDMARK_MAX_VECTORS:
+        raise ValueError(f'At most {LANDMARK_MAX_VECTORS} landmark vectors per request')
+    if not np.all(np.isfinite(vectors)):
+        raise ValueError('Landmarks contain non-finite values')
+    return vectors
+
+@app.route('/predict_landmarks', methods=['POST'])
+def predict_landmarks():
+    """Endpoint to predict signs from pre-extracted hand landmarks (no image upload)"""
+    try:
+        timer = StageTimer('/predict_landmarks')
+        try:
+            vectors = parse_landmark_payload(request)
+            timer.lap('parse')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        if model_manager.get_engine() is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model not available'
+            }), 500
+        
+        # Submit every vector at once so they share forward passes in the batcher
+        futures = [batch_predictor.submit(vector) for vector in vectors]
+        predictions = []
+        for future in futures:
+            scores = future.result(timeout=BATCH_RESULT_TIMEOUT)
+            predicted_class = int(np.argmax(scores))
+            predictions.append({
+                'prediction': classes[predicted_class],
+                'confidence': float(scores[predicted_class])
+            })
+        
+        timer.lap('classify')
+        
+        if len(predictions) == 1:
+            body = jsonify({'success': True, **predictions[0]})
+        else:
+            body = jsonify({'success': True, 'predictions': predictions})
+        timer.lap('serialize')
+        stage_stats.record(timer)
+        log_event(logger, '/predict_landmarks', "Landmark prediction", vectors=len(predictions),
+                  predictions=predictions[:4], timings_ms=timer.as_ms())
+        return body
+        
+    except Exception as e:
+        logger.exception(f"Error in predict_landmarks endpoint: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -230,5 +779,6 @@ def predict():
 
 # Run the app on port 8000 (different from the main app)
 if __name__ == '__main__':
-    print(f"Flask app starting with model_loaded={model_manager.is_model_loaded()}")
+    logger.info(f"Flask app starting with model_loaded={model_manager.is_model_loaded()}")
+    # Flask development server; use `gunicorn -c gunicorn.conf.py` in production
     app.run(host='0.0.0.0', port=8000, debug=False)
\ No newline at end of file
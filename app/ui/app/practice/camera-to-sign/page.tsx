@@ -157,7 +157,8 @@ function CameraToSignPage() {
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify({ image: base64Data }),
+      // Only the prediction is used here, so skip server-side annotation
+      body: JSON.stringify({ image: base64Data, annotate: "none" }),
     })
       .then((response) => response.json())
       .then((data) => {